@@ -1,13 +1,24 @@
 import os
 import re
 import json
+import time
 import random
+import operator
+import bisect
+import functools
+import heapq
+import threading
+import traceback
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from flask import Flask, request, jsonify
 from slack_sdk import WebClient
+from slack_sdk.errors import SlackApiError
 from slack_sdk.signature import SignatureVerifier
 import gspread
 from google.oauth2.service_account import Credentials
+from requests.adapters import HTTPAdapter
 
 app = Flask(__name__)
 
@@ -20,9 +31,21 @@ GOOGLE_SHEET_ID = os.environ.get('GOOGLE_SHEET_ID', '1CRWaO855R-_8GKR2Pwpqw28ZFW
 slack_client = WebClient(token=SLACK_BOT_TOKEN)
 signature_verifier = SignatureVerifier(SLACK_SIGNING_SECRET)
 
+def post_message(channel, text):
+    """Post to a channel, honoring Slack's Retry-After on rate limits"""
+    for attempt in range(2):
+        try:
+            slack_client.chat_postMessage(channel=channel, text=text)
+            return
+        except SlackApiError as e:
+            if attempt == 0 and e.response.status_code == 429:
+                time.sleep(int(e.response.headers.get('Retry-After', 1)))
+                continue
+            raise
+
 # ============== USER ID MAPPING ==============
 # Direct mapping of Slack User IDs to names - most reliable method
-NAOMI_USER_IDS = ['U0AAFBUSNSD']
+NAOMI_USER_IDS = frozenset(['U0AAFBUSNSD'])
 
 def detect_user_name(user_id):
     """Detect user by Slack User ID"""
@@ -31,28 +54,52 @@ def detect_user_name(user_id):
     return 'Jacob'
 
 # ============== DUPLICATE EVENT PREVENTION ==============
-processed_events = set()
+# OrderedDict gives true FIFO eviction - the old set rebuild relied on
+# set iteration order, which is not insertion order
+processed_events = OrderedDict()
+_processed_events_lock = threading.Lock()
 MAX_PROCESSED_EVENTS = 100
 
 def is_duplicate_event(event_id):
-    global processed_events
-    
     if not event_id:
         return False
-    
-    if event_id in processed_events:
-        return True
-    
-    processed_events.add(event_id)
-    
-    if len(processed_events) > MAX_PROCESSED_EVENTS:
-        processed_events = set(list(processed_events)[-50:])
-    
+
+    # Check-insert-evict must be atomic: concurrent webhook threads may
+    # carry the same retried event
+    with _processed_events_lock:
+        if event_id in processed_events:
+            return True
+
+        processed_events[event_id] = None
+
+        if len(processed_events) > MAX_PROCESSED_EVENTS:
+            processed_events.popitem(last=False)
+
     return False
 
+# ============== PER-CHANNEL STATE ==============
+
+class BoundedDict(OrderedDict):
+    """Dict capped at max_entries - oldest keys are evicted first so
+    per-channel state cannot grow without bound on a long-running
+    process. Writes are locked since handler threads share these"""
+
+    def __init__(self, max_entries=256):
+        super().__init__()
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            if key in self:
+                self.move_to_end(key)
+            super().__setitem__(key, value)
+            while len(self) > self.max_entries:
+                self.popitem(last=False)
+
 # ============== UNIVERSAL UNDO SYSTEM ==============
 # Stores last action for each channel for undo
-last_action = {}
+last_action = BoundedDict()
 
 def store_undo_action(channel_id, action_type, data):
     """Store action for potential undo"""
@@ -81,8 +128,8 @@ def clear_undo_action(channel_id):
         del last_action[channel_id]
 
 # ============== STORAGE FOR LIST RESULTS ==============
-last_list_results = {}
-last_debt_list = {}
+last_list_results = BoundedDict()
+last_debt_list = BoundedDict()
 
 # ============== MASTER CATEGORIES ==============
 CATEGORIES = {
@@ -336,6 +383,17 @@ CATEGORIES = {
     },
 }
 
+# Each category's keywords compiled into one alternation, searched in
+# CATEGORIES order. One C-level scan per category replaces the Python
+# loop over every keyword, and category precedence is exactly the same
+# as the old nested loop (keywords can overlap across categories, so a
+# single fused pattern would change which category wins).
+CATEGORY_REGEXES = [
+    (category, data,
+     re.compile('|'.join(map(re.escape, sorted(data['keywords'], key=len, reverse=True)))))
+    for category, data in CATEGORIES.items()
+]
+
 # ============== BUDGET & SETTINGS ==============
 DEFAULT_BUDGETS = {
     'Food & Dining': 200000,
@@ -425,12 +483,19 @@ SETTINGS_DEFAULTS = {
     'warnings': True,
 }
 
-# Income keywords - EXACT word match to avoid "coffee" containing "fee"
-INCOME_KEYWORDS_EXACT = ['salary', 'commission', 'bonus', 'income', 'revenue', 'wage', 'pay',
-                         'lương', 'hoa hồng', 'thưởng', 'thu nhập', 'tiền lương', 'fee']
+# Income keywords - EXACT word match to avoid "coffee" containing "fee".
+# Single words match via set intersection; multi-word phrases need a
+# substring check since tokenization splits them.
+INCOME_KEYWORDS_SINGLE = frozenset(['salary', 'commission', 'bonus', 'income', 'revenue',
+                                    'wage', 'pay', 'lương', 'thưởng', 'fee'])
+INCOME_KEYWORDS_MULTI = ('hoa hồng', 'thu nhập', 'tiền lương')
 
 # Loan keywords for detection
 LOAN_KEYWORDS = ['cho mượn', 'mượn', 'cho vay', 'vay', 'nợ', 'thiếu', 'lend', 'borrow', 'loan', 'debt', 'owed']
+# Business payments that mention a person but must not change the payer
+BUSINESS_PERSON_KEYWORDS = ('gởi jacob', 'goi jacob', 'tiền jacob', 'tien jacob', 'jacob fee', 'fee jacob',
+                            'chị dương', 'chi duong', 'tiền dương', 'tien duong')
+
 REPAY_KEYWORDS = ['trả nợ', 'trả lại', 'repay', 'pay back', 'paid back', 'trả tiền', 'nhận lại']
 
 MONTH_NAMES = {
@@ -447,25 +512,114 @@ MONTH_NAMES_REVERSE = {
     7: 'Jul', 8: 'Aug', 9: 'Sep', 10: 'Oct', 11: 'Nov', 12: 'Dec'
 }
 
+MONTH_FULL_NAMES = ('January', 'February', 'March', 'April', 'May', 'June',
+                    'July', 'August', 'September', 'October', 'November', 'December')
+
+# Classifies a list-command word with one dict probe instead of testing
+# month/type/person membership separately
+LIST_WORD_CLASS = {
+    **{name: ('month', num) for name, num in MONTH_NAMES.items()},
+    'income': ('type', 'Income'), 'expense': ('type', 'Expense'),
+    'jacob': ('person', 'Jacob'), 'naomi': ('person', 'Naomi'),
+    'joint': ('person', 'Joint'),
+}
+
+# Precompiled patterns for the per-message hot path - compiled once at import
+# Single alternation covering both Vietnamese decimal commas (15,5k) and
+# thousand separators (1,000,000) so parse_amount scans the string once;
+# branch order gives the decimal form precedence
+RE_AMOUNT = re.compile(r'^(?:(?P<whole>\d+),(?P<frac>\d+)(?P<dsfx>[mkMK])|(?P<num>[\d.,]*\d[\d.,]*)(?P<sfx>[mkMK]?),*)$')
+AMOUNT_SCALE = {'': 1, 'k': 1000, 'K': 1000, 'm': 1000000, 'M': 1000000}
+RE_YEAR_MONTH = re.compile(r'^(\d{4})-(\d{1,2})$')
+# Strips currency symbol and whitespace in one C-level pass; commas stay
+# because they are significant (decimal vs thousand separator)
+AMOUNT_DELETE_TABLE = str.maketrans('', '', '₩ \t\n\r')
+RE_WORD = re.compile(r'\b\w+\b')
+RE_BOT_MENTION = re.compile(r'^<@U[A-Z0-9]+>')
+
+# ============== SHEET READ CACHE ==============
+# Google Sheets reads dominate command latency, so cache read-heavy helpers
+# for a short TTL and bust the cache on every write.
+CACHE_TTL = int(os.environ.get('CACHE_TTL', 30))
+
+_sheet_cache = {}
+
+def ttl_cached(func):
+    """Cache a function's result for CACHE_TTL seconds (keyed by args)"""
+    @functools.wraps(func)
+    def wrapper(*args):
+        key = (func.__name__,) + args
+        hit = _sheet_cache.get(key)
+        now = time.time()
+        if hit and now - hit[0] < CACHE_TTL:
+            return hit[1]
+        result = func(*args)
+        _sheet_cache[key] = (now, result)
+        return result
+    return wrapper
+
+def clear_sheet_cache():
+    """Invalidate cached reads so writes are visible immediately"""
+    _sheet_cache.clear()
+
 # ============== HELPER FUNCTIONS ==============
 
-def get_gsheet_client():
-    creds_json = os.environ.get('GOOGLE_CREDENTIALS')
-    if creds_json:
-        creds_dict = json.loads(creds_json)
-        creds = Credentials.from_service_account_info(creds_dict, scopes=[
+# Lazily-initialized gspread singletons - authorizing and re-opening the
+# spreadsheet on every call costs several HTTPS round-trips.
+_gsheet_lock = threading.RLock()
+_gsheet_client = None
+_worksheets = {}
+
+# Parse the service-account JSON once at startup instead of on every
+# (re-)authorization
+_CREDS_DICT = json.loads(os.environ['GOOGLE_CREDENTIALS']) if os.environ.get('GOOGLE_CREDENTIALS') else None
+
+def _authorize_gsheet_client():
+    if _CREDS_DICT:
+        creds = Credentials.from_service_account_info(_CREDS_DICT, scopes=[
             'https://www.googleapis.com/auth/spreadsheets',
             'https://www.googleapis.com/auth/drive'
         ])
-        return gspread.authorize(creds)
+        client = gspread.authorize(creds)
+        # Pool keep-alive connections so back-to-back Sheets calls reuse
+        # the same TLS connection instead of re-handshaking
+        client.session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=10))
+        return client
     return None
 
+def get_gsheet_client():
+    global _gsheet_client
+    with _gsheet_lock:
+        if _gsheet_client is None:
+            _gsheet_client = _authorize_gsheet_client()
+        return _gsheet_client
+
+def reset_gsheet_client():
+    """Drop cached handles so the next call re-authorizes"""
+    global _gsheet_client
+    with _gsheet_lock:
+        _gsheet_client = None
+        _worksheets.clear()
+
 def get_sheet(sheet_name):
-    gc = get_gsheet_client()
-    if gc:
-        spreadsheet = gc.open_by_key(GOOGLE_SHEET_ID)
-        return spreadsheet.worksheet(sheet_name)
-    return None
+    with _gsheet_lock:
+        sheet = _worksheets.get(sheet_name)
+        if sheet:
+            return sheet
+        gc = get_gsheet_client()
+        if not gc:
+            return None
+        try:
+            sheet = gc.open_by_key(GOOGLE_SHEET_ID).worksheet(sheet_name)
+        except gspread.exceptions.APIError:
+            # Auth expired on a long-running process - re-authorize and retry once
+            reset_gsheet_client()
+            gc = get_gsheet_client()
+            if not gc:
+                return None
+            sheet = gc.open_by_key(GOOGLE_SHEET_ID).worksheet(sheet_name)
+        _worksheets[sheet_name] = sheet
+        return sheet
 
 def get_transaction_sheet():
     return get_sheet('Transaction')
@@ -473,70 +627,101 @@ def get_transaction_sheet():
 def get_fixed_bills_sheet():
     return get_sheet('Fixed Bills')
 
+@ttl_cached
+def get_transaction_rows():
+    """One cached fetch of the raw transaction rows (A=Date .. H=Source),
+    shared by readers that scan the whole sheet so back-to-back commands
+    reuse a single API call"""
+    sheet = get_transaction_sheet()
+    if not sheet:
+        return []
+    return sheet.get('A2:H')
+
 def parse_amount(amount_str):
-    amount_str = str(amount_str).replace('₩', '').replace(' ', '').strip()
+    amount_str = str(amount_str).translate(AMOUNT_DELETE_TABLE)
 
-    # Handle Vietnamese decimal notation (15,5k = 15.5k, 1,5m = 1.5m)
-    # If format is like "15,5k" or "1,5m", convert comma to dot
-    if re.match(r'^\d+,\d+[mkMK]$', amount_str):
-        amount_str = amount_str.replace(',', '.')
-    else:
-        # Remove commas used as thousand separators (1,000,000)
-        amount_str = amount_str.replace(',', '')
+    # Fast path for the most common shape - a plain integer like '45000' -
+    # which needs no regex and no float round-trip
+    if amount_str.isdecimal():
+        return int(amount_str)
 
-    match = re.match(r'^([\d.]+)([mkMK]?)$', amount_str)
-    if match:
-        num = float(match.group(1))
-        suffix = match.group(2).upper()
-        if suffix == 'M':
-            return int(num * 1000000)
-        elif suffix == 'K':
-            return int(num * 1000)
-        return int(num)
-    return None
+    match = RE_AMOUNT.match(amount_str)
+    if not match:
+        return None
+
+    # Vietnamese decimal notation (15,5k = 15.5k, 1,5m = 1.5m)
+    if match.group('whole'):
+        value = float(match.group('whole') + '.' + match.group('frac'))
+        return int(value * AMOUNT_SCALE[match.group('dsfx')])
+
+    # Plain number, possibly with thousand-separator commas (1,000,000)
+    try:
+        value = float(match.group('num').replace(',', ''))
+    except ValueError:
+        return None
+    return int(value * AMOUNT_SCALE[match.group('sfx')])
+
+def to_number(value):
+    """Raw sheet ranges return strings - coerce cell values to numbers"""
+    try:
+        num = float(str(value).replace(',', ''))
+    except ValueError:
+        return 0
+    return int(num) if num.is_integer() else num
 
+@functools.lru_cache(maxsize=512)
 def fmt(amount):
+    # Multiply instead of divide (faster float path); amounts repeat a lot
+    # across reports so memoize the formatted strings
     if amount >= 1000000:
-        return f"₩{amount/1000000:.1f}M"
+        return f"₩{amount * 1e-6:.1f}M"
     elif amount >= 1000:
-        return f"₩{amount/1000:.0f}K"
+        return f"₩{amount * 1e-3:.0f}K"
     return f"₩{amount:,.0f}"
 
 def extract_amount_from_text(text):
     words = text.split()
     amount = None
     remaining_words = []
-    
+
     for word in words:
-        parsed = parse_amount(word)
+        # Only words starting with a digit, ₩ or . can be amounts -
+        # skip the regex machinery for everything else
+        parsed = None
+        if word[0].isdigit() or word[0] in '₩.':
+            parsed = parse_amount(word)
         if parsed and amount is None:
             amount = parsed
         else:
             remaining_words.append(word)
-    
+
     return amount, ' '.join(remaining_words)
 
-def parse_month(text):
+def parse_month(text, now=None):
     text = text.lower().strip()
-    now = datetime.now()
-    
-    match = re.match(r'^(\d{4})-(\d{1,2})$', text)
+
+    match = RE_YEAR_MONTH.match(text)
     if match:
         return int(match.group(1)), int(match.group(2))
-    
+
     if text in MONTH_NAMES:
+        now = now or datetime.now()
         month = MONTH_NAMES[text]
         year = now.year if month <= now.month else now.year - 1
         return year, month
-    
+
     return None
 
-def extract_month_from_text(text):
+def extract_month_from_text(text, now=None):
     words = text.split()
-    now = datetime.now()
-    
+    now = now or datetime.now()
+
     for i, word in enumerate(words):
-        month_info = parse_month(word.lower())
+        word_lower = word.lower()
+        # Gate on the cheap checks before running the month parser
+        if word_lower not in MONTH_NAMES and not word[0].isdigit():
+            continue
+        month_info = parse_month(word_lower, now)
         if month_info:
             year, month = month_info
             cleaned_words = words[:i] + words[i+1:]
@@ -546,109 +731,141 @@ def extract_month_from_text(text):
     
     return text, now.year, now.month, False
 
+PERSON_WORDS = frozenset(['jacob', 'naomi', 'joint'])
+
 def extract_person_from_text(text):
     words = text.lower().split()
     person = None
     remaining_words = []
-    
+
     for word in words:
-        if word in ['jacob', 'naomi', 'joint']:
+        if word in PERSON_WORDS:
             person = word.capitalize()
         else:
             remaining_words.append(word)
     
     return person, ' '.join(remaining_words)
 
-def detect_category(text):
-    text_lower = text.lower()
-    
-    for category, data in CATEGORIES.items():
-        for keyword in data['keywords']:
-            if keyword in text_lower:
-                return category, data
-    
+def detect_category(text_lower):
+    for category, data, pattern in CATEGORY_REGEXES:
+        if pattern.search(text_lower):
+            return category, data
+
     return 'Other', {'emoji': ['📝'], 'responses': ["Logged! 📝"]}
 
-def is_income(text, category):
+def is_income(text_lower, category):
     """Check if transaction is income - using EXACT word match"""
-    text_lower = text.lower()
-    
     if category == 'Income':
         return True
-    
-    words = re.findall(r'\b\w+\b', text_lower)
-    
-    for keyword in INCOME_KEYWORDS_EXACT:
-        if keyword in words:
-            return True
-    
-    return False
 
-def is_loan_transaction(text):
+    words = RE_WORD.findall(text_lower)
+
+    if INCOME_KEYWORDS_SINGLE.intersection(words):
+        return True
+
+    return any(kw in text_lower for kw in INCOME_KEYWORDS_MULTI)
+
+def is_loan_transaction(text_lower):
     """Check if transaction is a loan/debt"""
-    text_lower = text.lower()
     for keyword in LOAN_KEYWORDS:
         if keyword in text_lower:
             return True
     return False
 
-def is_repayment(text):
+def is_repayment(text_lower):
     """Check if transaction is a repayment"""
-    text_lower = text.lower()
     for keyword in REPAY_KEYWORDS:
         if keyword in text_lower:
             return True
     return False
 
-def get_fixed_bills_dict():
+# Short names users type mapped to a substring of the bill's category
+FIXED_BILL_ALIASES = {
+    'gas': 'gas', 'electricity': 'electricity', 'electric': 'electricity',
+    'internet': 'internet', 'wifi': 'internet', 'rent': 'rent',
+    'điện': 'electricity', 'nước': 'water', 'mạng': 'internet',
+}
+
+# Immutable bill record - lighter than a dict per row and shared freely
+# between the alias and token indexes
+Bill = namedtuple('Bill', ['category', 'amount', 'type', 'person'])
+
+@ttl_cached
+def get_fixed_bills():
+    """Load active fixed bills: unique bills keyed by category, plus an
+    alias map from every lookup key to the canonical category"""
     sheet = get_fixed_bills_sheet()
     if not sheet:
-        return {}
-    
-    records = sheet.get_all_records()
-    bills = {}
-    
-    for row in records:
-        category = row.get('Category', '')
-        if category and row.get('Status') == 'Active':
+        return {}, {}, {}
+
+    # List-of-lists with a header index instead of get_all_records(),
+    # which builds one dict per row
+    rows = sheet.get('A:H')
+    if not rows:
+        return {}, {}, {}
+    idx = {header: i for i, header in enumerate(rows[0])}
+
+    def cell(row, name, default=''):
+        i = idx.get(name)
+        return row[i] if i is not None and i < len(row) and row[i] != '' else default
+
+    bills = {}     # canonical category -> bill data
+    aliases = {}   # lowercase lookup key -> canonical category
+
+    for row in rows[1:]:
+        category = cell(row, 'Category')
+        if category and cell(row, 'Status') == 'Active':
             key = category.lower().strip()
             simple_key = key.split(' - ')[0].split(' ')[0]
-            
-            bill_data = {
-                'category': category,
-                'amount': row.get('Amount', 0),
-                'type': row.get('Type', 'Personal'),
-                'person': row.get('Person', 'Joint'),
-            }
-            bills[key] = bill_data
-            if simple_key != key:
-                bills[simple_key] = bill_data
-    
-    return bills
 
-def find_fixed_bill(text):
-    bills = get_fixed_bills_dict()
-    text_lower = text.lower().strip()
-    
-    if text_lower in bills:
-        return bills[text_lower]
-    
-    for key, bill in bills.items():
+            bills[category] = Bill(
+                category=category,
+                amount=to_number(cell(row, 'Amount', 0)),
+                type=cell(row, 'Type', 'Personal'),
+                person=cell(row, 'Person', 'Joint'),
+            )
+            aliases[key] = category
+            aliases.setdefault(simple_key, category)
+
+    # Resolve the static aliases against the loaded bills once per load,
+    # so alias lookups in find_fixed_bill are a single dict probe
+    for alias, target in FIXED_BILL_ALIASES.items():
+        if alias in aliases:
+            continue
+        for key, category in list(aliases.items()):
+            if target in key:
+                aliases[alias] = category
+                break
+
+    # Inverted token index: each word of each alias key points back at
+    # its (key, category) pair so find_fixed_bill can probe by word
+    # instead of scanning every alias
+    token_index = {}
+    for key, category in aliases.items():
+        for token in key.split():
+            token_index.setdefault(token, (key, category))
+
+    return bills, aliases, token_index
+
+def find_fixed_bill(text_lower):
+    bills, aliases, token_index = get_fixed_bills()
+
+    category = aliases.get(text_lower)
+    if category:
+        return bills[category]
+
+    # Fast path: probe the token index per word, then confirm with the
+    # same partial-match rule as the full scan below
+    for token in text_lower.split():
+        hit = token_index.get(token)
+        if hit and (text_lower in hit[0] or hit[0] in text_lower):
+            return bills[hit[1]]
+
+    # Fallback: partial match for descriptions that embed the bill name
+    for key, category in aliases.items():
         if text_lower in key or key in text_lower:
-            return bill
-    
-    aliases = {
-        'gas': 'gas', 'electricity': 'electricity', 'electric': 'electricity',
-        'internet': 'internet', 'wifi': 'internet', 'rent': 'rent',
-        'điện': 'electricity', 'nước': 'water', 'mạng': 'internet',
-    }
-    
-    if text_lower in aliases:
-        alias_key = aliases[text_lower]
-        for key, bill in bills.items():
-            if alias_key in key:
-                return bill
-    
+            return bills[category]
+
     return None
 
 def get_personality_response(category, category_data, amount, is_income_tx):
@@ -672,30 +889,23 @@ def get_emoji(category, category_data, is_income_tx):
 
 # ============== BUDGET & WISDOM FUNCTIONS ==============
 
+@ttl_cached
 def get_monthly_spending_by_category(month=None):
     """Get total spending per category for a month"""
-    sheet = get_transaction_sheet()
-    if not sheet:
-        return {}
-
     if not month:
         month = datetime.now().strftime('%Y-%m-01')
 
-    records = sheet.get_all_records()
+    rows = get_transaction_rows()
     spending = {}
 
-    for row in records:
-        row_month = str(row.get('Month', ''))[:10]
-        if row_month != month:
+    for row in rows:
+        if len(row) < 7:
             continue
-
-        if row.get('Type') != 'Expense':
+        if str(row[6])[:10] != month or row[1] != 'Expense':
             continue
 
-        category = row.get('Category', 'Other')
-        amount = row.get('Amount', 0) or 0
-
-        spending[category] = spending.get(category, 0) + amount
+        category = row[2] or 'Other'
+        spending[category] = spending.get(category, 0) + to_number(row[3])
 
     return spending
 
@@ -770,66 +980,64 @@ def check_milestone(fund_name, old_balance, new_balance):
 
 # ============== DUPLICATE INCOME CHECK ==============
 
+@ttl_cached
+def get_income_index():
+    """Index income rows by (date, amount) so duplicate checks scan a
+    handful of candidates instead of the whole sheet"""
+    index = {}
+    for row in get_transaction_rows():
+        if len(row) >= 5 and row[1] == 'Income':
+            index.setdefault((row[0], to_number(row[3])), []).append(row)
+    return index
+
 def check_duplicate_income(tx_data):
     if tx_data['type'] != 'Income':
         return None
-    
-    sheet = get_transaction_sheet()
-    if not sheet:
-        return None
-    
-    records = sheet.get_all_records()
+
     today = datetime.now().strftime('%Y-%m-%d')
     amount = tx_data['amount']
     description_lower = tx_data['description'].lower()
-    
-    for row in records:
-        if (row.get('Type') == 'Income' and 
-            row.get('Date') == today and
-            row.get('Amount') == amount):
-            row_desc = str(row.get('Description', '')).lower()
-            if (description_lower in row_desc or 
-                row_desc in description_lower or
-                'lương' in description_lower and 'lương' in row_desc or
-                'salary' in description_lower and 'salary' in row_desc or
-                'commission' in description_lower and 'commission' in row_desc):
-                return row
-    
+
+    for row in get_income_index().get((today, amount), []):
+        row_desc = str(row[4]).lower()
+        if (description_lower in row_desc or
+            row_desc in description_lower or
+            'lương' in description_lower and 'lương' in row_desc or
+            'salary' in description_lower and 'salary' in row_desc or
+            'commission' in description_lower and 'commission' in row_desc):
+            return row
+
     return None
 
 # ============== LOAN/DEBT FUNCTIONS ==============
 
 def get_outstanding_loans():
     """Get all loan/debt transactions that haven't been marked as paid"""
-    sheet = get_transaction_sheet()
-    if not sheet:
-        return []
-    
-    records = sheet.get_all_records()
+    rows = get_transaction_rows()
     loans = []
-    
-    for i, row in enumerate(records):
-        if row.get('Type') == 'Expense' and row.get('Category') == 'Loan & Debt':
-            description = str(row.get('Description', ''))
+
+    for i, row in enumerate(rows):
+        if len(row) < 5:
+            continue
+        if row[1] == 'Expense' and row[2] == 'Loan & Debt':
+            description = str(row[4])
             # Skip if it's marked as [PAID] or is a repayment
             if not description.startswith('[PAID]') and not is_repayment(description.lower()):
+                if len(row) < 7:
+                    row = row + [''] * (7 - len(row))
                 loans.append({
                     'row_index': i + 2,
-                    'date': row.get('Date', ''),
+                    'date': row[0],
                     'type': 'Expense',
                     'category': 'Loan & Debt',
-                    'amount': row.get('Amount', 0),
+                    'amount': to_number(row[3]),
                     'description': description,
-                    'person': row.get('Person', ''),
-                    'month': row.get('Month', ''),
+                    'person': row[5],
+                    'month': row[6],
+                    '_row': row,
                 })
-    
-    return loans
 
-def has_outstanding_loans():
-    """Check if there are any outstanding loans"""
-    loans = get_outstanding_loans()
-    return len(loans) > 0
+    return loans
 
 def mark_loan_as_paid(loan_index, channel_id):
     """Mark a loan as paid by adding [PAID] prefix and logging income"""
@@ -864,7 +1072,8 @@ def mark_loan_as_paid(loan_index, channel_id):
     ]
     
     sheet.append_row(income_row)
-    
+    clear_sheet_cache()
+
     # Store for undo
     return True, loan, {
         'loan_row_index': loan['row_index'],
@@ -882,30 +1091,33 @@ def undo_paid(undo_data):
         # 1. Restore original description (remove [PAID] prefix)
         sheet.update_cell(undo_data['loan_row_index'], 5, undo_data['original_desc'])
         
-        # 2. Find and delete the income entry
-        records = sheet.get_all_records()
-        for i, row in enumerate(records):
-            if (row.get('Type') == 'Income' and 
-                row.get('Category') == 'Loan & Debt' and
-                f"nhận lại/trả nợ: {undo_data['original_desc']}" in str(row.get('Description', ''))):
+        # 2. Find and delete the income entry (fresh narrow read - row
+        # indexes must reflect the live sheet before delete_rows)
+        rows = sheet.get('A2:E')
+        needle = f"nhận lại/trả nợ: {undo_data['original_desc']}"
+        for i, row in enumerate(rows):
+            if (len(row) >= 5 and
+                row[1] == 'Income' and
+                row[2] == 'Loan & Debt' and
+                needle in str(row[4])):
                 sheet.delete_rows(i + 2)
                 break
-        
+
+        clear_sheet_cache()
         return True, "Paid action undone"
     except Exception as e:
         return False, str(e)
 
 # ============== TRANSACTION PARSING ==============
 
-def parse_transaction(text, user_name):
+def parse_transaction(text, user_name, now=None):
     original_text = text.strip()
 
-    text, year, month, is_backdated = extract_month_from_text(original_text)
+    text, year, month, is_backdated = extract_month_from_text(original_text, now)
 
     # Check if this is a business payment mentioning a person (don't extract as person)
-    business_person_keywords = ['gởi jacob', 'goi jacob', 'tiền jacob', 'tien jacob', 'jacob fee', 'fee jacob',
-                                 'chị dương', 'chi duong', 'tiền dương', 'tien duong']
-    is_business_payment = any(kw in text.lower() for kw in business_person_keywords)
+    text_lower = text.lower()
+    is_business_payment = any(kw in text_lower for kw in BUSINESS_PERSON_KEYWORDS)
 
     if is_business_payment:
         person = user_name  # Keep original user, don't extract from text
@@ -922,26 +1134,29 @@ def parse_transaction(text, user_name):
     description = description.strip()
     if not description:
         description = "Transaction"
-    
-    fixed_bill = find_fixed_bill(description)
+
+    # Lowercase once for the whole classification pipeline
+    description_lower = description.lower()
+
+    fixed_bill = find_fixed_bill(description_lower)
     
     if fixed_bill:
-        category = fixed_bill['category']
+        category = fixed_bill.category
         category_data = {'emoji': ['📋'], 'responses': ["Fixed bill logged! 📋"]}
-        if fixed_bill['person'] != 'Both':
-            person = fixed_bill['person']
+        if fixed_bill.person != 'Both':
+            person = fixed_bill.person
         else:
             person = 'Joint'
     else:
-        if is_loan_transaction(description):
+        if is_loan_transaction(description_lower):
             category = 'Loan & Debt'
             category_data = CATEGORIES.get('Loan & Debt', {'emoji': ['🤝'], 'responses': ["Loan tracked! 🤝"]})
         else:
-            category, category_data = detect_category(description)
-    
-    tx_is_income = is_income(description, category)
-    
-    if is_repayment(description):
+            category, category_data = detect_category(description_lower)
+
+    tx_is_income = is_income(description_lower, category)
+
+    if is_repayment(description_lower):
         tx_is_income = True
         category = 'Loan & Debt'
     
@@ -956,23 +1171,24 @@ def parse_transaction(text, user_name):
         'year': year,
         'month': month,
         'is_backdated': is_backdated,
-        'is_loan': is_loan_transaction(description)
+        'is_loan': is_loan_transaction(description_lower)
     }
 
 # ============== TRANSACTION LOGGING ==============
 
-def log_transaction(tx_data):
+def log_transaction(tx_data, now=None):
     sheet = get_transaction_sheet()
     if not sheet:
         return False, "Cannot connect to Google Sheets", None
-    
-    year = tx_data.get('year', datetime.now().year)
-    month = tx_data.get('month', datetime.now().month)
-    
+
+    now = now or datetime.now()
+    year = tx_data.get('year', now.year)
+    month = tx_data.get('month', now.month)
+
     if tx_data.get('is_backdated'):
         date_str = f"{year}-{month:02d}-15"
     else:
-        date_str = datetime.now().strftime('%Y-%m-%d')
+        date_str = now.strftime('%Y-%m-%d')
     
     month_start = f"{year}-{month:02d}-01"
     
@@ -988,7 +1204,8 @@ def log_transaction(tx_data):
     ]
     
     sheet.append_row(row)
-    
+    clear_sheet_cache()
+
     # Get the row index of newly added row
     all_values = sheet.get_all_values()
     new_row_index = len(all_values)
@@ -1004,6 +1221,7 @@ def delete_row_by_index(row_index):
     try:
         row_data = sheet.row_values(row_index)
         sheet.delete_rows(row_index)
+        clear_sheet_cache()
         return True, row_data
     except Exception as e:
         return False, str(e)
@@ -1030,7 +1248,7 @@ def build_response(tx_data, duplicate_warning=None):
         response += f"📅 {month_name} (backdated)\n"
     
     if fixed_bill:
-        default_amount = fixed_bill['amount']
+        default_amount = fixed_bill.amount
         if default_amount > 0:
             ratio = amount / default_amount
             
@@ -1093,79 +1311,93 @@ def build_response(tx_data, duplicate_warning=None):
 # ============== LIST/DELETE/EDIT FUNCTIONS ==============
 
 def get_all_transactions():
-    sheet = get_transaction_sheet()
-    if not sheet:
-        return []
-    
-    records = sheet.get_all_records()
+    rows = get_transaction_rows()
     transactions = []
-    
-    for i, row in enumerate(records):
-        tx_type = row.get('Type', '')
+
+    for i, row in enumerate(rows):
+        if len(row) < 2:
+            continue
+        tx_type = row[1]
         if tx_type in ['Income', 'Expense', 'Fund Add', 'Fund Balance']:
+            if len(row) < 7:
+                row = row + [''] * (7 - len(row))
             transactions.append({
                 'row_index': i + 2,
-                'date': row.get('Date', ''),
+                'date': row[0],
                 'type': tx_type,
-                'category': row.get('Category', ''),
-                'amount': row.get('Amount', 0),
-                'description': row.get('Description', ''),
-                'person': row.get('Person', ''),
-                'month': row.get('Month', ''),
+                'category': row[2],
+                'amount': to_number(row[3]),
+                'description': row[4],
+                'person': row[5],
+                'month': row[6],
+                # Raw sheet row kept so delete can record it for undo
+                # without a row_values() round-trip
+                '_row': row,
+                # Pre-lowered fields so filters don't re-lower per call
+                '_type_l': tx_type.lower(),
+                '_category_l': row[2].lower(),
+                '_description_l': row[4].lower(),
+                '_person_l': row[5].lower(),
             })
-    
+
     return transactions
 
 def filter_transactions(transactions, filter_type=None, filter_category=None, filter_person=None, filter_month=None, limit=None):
-    filtered = transactions
-    
-    if filter_type:
-        filtered = [t for t in filtered if t['type'].lower() == filter_type.lower()]
-    
-    if filter_category:
-        if filter_category.lower() in ['debt', 'loan', 'nợ', 'mượn']:
-            filtered = [t for t in filtered if t['category'] == 'Loan & Debt']
-        else:
-            filtered = [t for t in filtered if filter_category.lower() in t['category'].lower() or 
-                        filter_category.lower() in t['description'].lower()]
-    
-    if filter_person:
-        filtered = [t for t in filtered if t['person'].lower() == filter_person.lower()]
-    
-    if filter_month:
-        filtered = [t for t in filtered if t['month'][:7] == filter_month]
-    
-    filtered = sorted(filtered, key=lambda x: x['date'], reverse=True)
-    
+    # Lowercase the filter values once, then test everything in one pass
+    # instead of building an intermediate list per active filter
+    ft = filter_type.lower() if filter_type else None
+    fc = filter_category.lower() if filter_category else None
+    fp = filter_person.lower() if filter_person else None
+    debt_only = fc in ['debt', 'loan', 'nợ', 'mượn']
+
+    filtered = []
+    for t in transactions:
+        if ft and t['_type_l'] != ft:
+            continue
+        if fc:
+            if debt_only:
+                if t['category'] != 'Loan & Debt':
+                    continue
+            elif fc not in t['_category_l'] and fc not in t['_description_l']:
+                continue
+        if fp and t['_person_l'] != fp:
+            continue
+        if filter_month and t['month'][:7] != filter_month:
+            continue
+        filtered.append(t)
+
     if limit:
-        filtered = filtered[:limit]
-    
-    return filtered
+        # Partial sort: O(N log limit) beats sorting the whole list
+        return heapq.nlargest(limit, filtered, key=operator.itemgetter('date'))
+
+    return sorted(filtered, key=operator.itemgetter('date'), reverse=True)
 
-def parse_list_command(text):
+def parse_list_command(text, now=None):
     words = text.lower().split()[1:]
-    
+
     filter_type = None
     filter_category = None
     filter_person = None
     filter_month = None
     limit = None
-    
-    now = datetime.now()
+
+    now = now or datetime.now()
     
     for word in words:
         if word.isdigit():
             limit = int(word)
-        elif word in MONTH_NAMES:
-            month_num = MONTH_NAMES[word]
+            continue
+        kind = LIST_WORD_CLASS.get(word)
+        if kind is None:
+            filter_category = word
+        elif kind[0] == 'month':
+            month_num = kind[1]
             year = now.year if month_num <= now.month else now.year - 1
             filter_month = f"{year}-{month_num:02d}"
-        elif word in ['income', 'expense']:
-            filter_type = word.capitalize()
-        elif word in ['jacob', 'naomi', 'joint']:
-            filter_person = word.capitalize()
+        elif kind[0] == 'type':
+            filter_type = kind[1]
         else:
-            filter_category = word
+            filter_person = kind[1]
     
     if not filter_month and not filter_category and not limit:
         filter_month = now.strftime('%Y-%m')
@@ -1180,31 +1412,33 @@ def format_transaction_list(transactions, title, channel_id, is_debt_list=False)
     if is_debt_list:
         last_debt_list[channel_id] = transactions
     
-    msg = f"📋 *{title}:*\n\n"
-    
+    # Build lines in a list and join once instead of growing msg with +=
+    parts = [f"📋 *{title}:*\n\n"]
+
     for i, tx in enumerate(transactions[:20], 1):
         date_str = tx['date'][:10]
+        # Dates have a fixed YYYY-MM-DD layout - slicing beats strptime,
+        # which re-parses its format string on every call
         try:
-            date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-            date_display = date_obj.strftime('%b %d')
-        except:
+            date_display = f"{MONTH_NAMES_REVERSE[int(date_str[5:7])]} {date_str[8:10]}"
+        except (ValueError, KeyError):
             date_display = date_str
-        
+
         emoji = "💵" if tx['type'] == 'Income' else "🎯" if tx['type'] in ['Fund Add', 'Fund Balance'] else "💸"
         amount = tx['amount'] or 0
         description = tx['description'][:30] + "..." if len(tx['description']) > 30 else tx['description']
-        
-        msg += f"{i}. {emoji} {date_display} | {tx['category']} | {fmt(amount)} | {description}\n"
-    
+
+        parts.append(f"{i}. {emoji} {date_display} | {tx['category']} | {fmt(amount)} | {description}\n")
+
     if len(transactions) > 20:
-        msg += f"\n... and {len(transactions) - 20} more"
-    
+        parts.append(f"\n... and {len(transactions) - 20} more")
+
     if is_debt_list:
-        msg += f"\n\n*Mark as paid:* `paid 1`"
+        parts.append("\n\n*Mark as paid:* `paid 1`")
     else:
-        msg += f"\n\n*Delete:* `delete 1` or `delete 1,2,3`"
-    
-    return msg
+        parts.append("\n\n*Delete:* `delete 1` or `delete 1,2,3`")
+
+    return "".join(parts)
 
 def parse_delete_targets(target_str):
     targets = []
@@ -1234,11 +1468,11 @@ def delete_transactions(targets, channel_id):
     if not sheet:
         return False, "Cannot connect to Google Sheets", []
     
-    transactions = get_all_transactions()
-    
     if targets and targets[0] == 'last':
         count = targets[1] if len(targets) > 1 else 1
-        sorted_tx = sorted(transactions, key=lambda x: x['date'], reverse=True)
+        # Only 'delete last' needs a fresh scan; numeric targets resolve
+        # entirely through the channel's cached list
+        sorted_tx = sorted(get_all_transactions(), key=operator.itemgetter('date'), reverse=True)
         targets = [i + 1 for i in range(min(count, len(sorted_tx)))]
         last_list_results[channel_id] = sorted_tx
     
@@ -1258,20 +1492,41 @@ def delete_transactions(targets, channel_id):
     try:
         for idx in sorted_targets:
             tx = list_results[idx - 1]
-            row_data = sheet.row_values(tx['row_index'])
+            # The raw row was captured when the list was fetched - only
+            # fall back to a row_values() round-trip if it is missing
+            # (e.g. entries from the debt list)
+            row_data = tx.get('_row') or sheet.row_values(tx['row_index'])
             deleted_rows_data.append({
                 'row_data': row_data,
                 'tx': tx
             })
-            sheet.delete_rows(tx['row_index'])
             deleted_items.append(tx)
-            
-            for item in list_results:
-                if item['row_index'] > tx['row_index']:
-                    item['row_index'] -= 1
-        
+
+        # One batchUpdate covering every target row instead of a
+        # delete_rows round-trip per row; requests apply sequentially, so
+        # sort by descending row index to keep each one's indexes valid
+        # as the previous ones remove rows above
+        sheet.spreadsheet.batch_update({'requests': [{
+            'deleteDimension': {
+                'range': {
+                    'sheetId': sheet.id,
+                    'dimension': 'ROWS',
+                    'startIndex': tx['row_index'] - 1,
+                    'endIndex': tx['row_index'],
+                }
+            }
+        } for tx in sorted(deleted_items, key=operator.itemgetter('row_index'), reverse=True)]})
+
+        # Renumber the cached list so follow-up delete/edit commands
+        # still point at the right rows: each entry drops by the number
+        # of deleted rows above it (one pass instead of one per delete)
+        deleted_indexes = sorted(tx['row_index'] for tx in deleted_items)
+        for item in list_results:
+            item['row_index'] -= bisect.bisect_left(deleted_indexes, item['row_index'])
+
+        clear_sheet_cache()
         return True, "Deleted successfully", deleted_items, deleted_rows_data
-    
+
     except Exception as e:
         return False, str(e), [], []
 
@@ -1282,22 +1537,24 @@ def undo_delete(deleted_rows_data):
         return False, "Cannot connect to Google Sheets"
     
     try:
-        restored = []
-        for item in deleted_rows_data:
-            sheet.append_row(item['row_data'])
-            restored.append(item['tx'])
+        # One append_rows call regardless of how many rows are restored
+        sheet.append_rows([item['row_data'] for item in deleted_rows_data])
+        restored = [item['tx'] for item in deleted_rows_data]
+        clear_sheet_cache()
         return True, restored
     except Exception as e:
         return False, str(e)
 
-def edit_transaction(row_index, new_amount):
+def edit_transaction(row_index, new_amount, old_value=None):
     sheet = get_transaction_sheet()
     if not sheet:
         return False, "Cannot connect to Google Sheets", None
-    
+
     try:
-        old_value = sheet.cell(row_index, 4).value
+        if old_value is None:
+            old_value = sheet.cell(row_index, 4).value
         sheet.update_cell(row_index, 4, new_amount)
+        clear_sheet_cache()
         return True, old_value, {'row_index': row_index, 'old_amount': int(float(old_value)), 'new_amount': new_amount}
     except Exception as e:
         return False, str(e), None
@@ -1310,66 +1567,93 @@ def undo_edit(edit_data):
     
     try:
         sheet.update_cell(edit_data['row_index'], 4, edit_data['old_amount'])
+        clear_sheet_cache()
         return True, f"Restored amount to {fmt(edit_data['old_amount'])}"
     except Exception as e:
         return False, str(e)
 
 # ============== STATUS FUNCTIONS ==============
 
+@ttl_cached
 def get_fund_status():
     sheet = get_transaction_sheet()
     if not sheet:
         return None
 
-    records = sheet.get_all_records()
+    # Raw list-of-lists (A=Date, B=Type, C=Category, D=Amount) - avoids
+    # the per-row dicts get_all_records() would allocate
+    rows = get_transaction_rows()
     funds = {}
 
-    for row in records:
-        if row.get('Type') == 'Fund Balance':
-            fund_name = row.get('Category', '')
-            row_date = str(row.get('Date', ''))
+    for row in rows:
+        if len(row) < 4:
+            continue
+        if row[1] == 'Fund Balance':
+            fund_name = row[2]
+            row_date = str(row[0])
 
             # Only update if this is newer or first occurrence
             if fund_name not in funds or row_date > funds[fund_name]['date']:
                 funds[fund_name] = {
-                    'amount': row.get('Amount', 0),
+                    'amount': to_number(row[3]),
                     'date': row_date
                 }
 
     return funds
 
-def get_monthly_summary(month=None):
+@ttl_cached
+def get_status_snapshot(month=None):
+    """One sheet read covering everything the status command needs:
+    fund balances, the monthly summary, and outstanding-loan presence"""
     sheet = get_transaction_sheet()
     if not sheet:
-        return None
-    
+        return None, None, False
+
     if not month:
         month = datetime.now().strftime('%Y-%m-01')
-    
-    records = sheet.get_all_records()
-    
+
+    rows = get_transaction_rows()
+
+    funds = {}
     income = {'Jacob': 0, 'Naomi': 0, 'Joint': 0}
     expenses = {'Jacob': 0, 'Naomi': 0, 'Joint': 0}
-    
-    for row in records:
-        row_month = str(row.get('Month', ''))[:10]
-        if row_month == month:
-            person = row.get('Person', 'Joint')
-            amount = row.get('Amount', 0) or 0
-            tx_type = row.get('Type', '')
-            
+    has_loans = False
+
+    for row in rows:
+        # gspread trims trailing empty cells - pad short rows like
+        # get_all_transactions does so e.g. a Fund Balance row with an
+        # empty Description/Person/Month still counts
+        if len(row) < 2:
+            continue
+        if len(row) < 7:
+            row = row + [''] * (7 - len(row))
+        date, tx_type, category, amount, description, person, row_month = row[:7]
+
+        if tx_type == 'Fund Balance':
+            date_str = str(date)
+            if category not in funds or date_str > funds[category]['date']:
+                funds[category] = {'amount': to_number(amount), 'date': date_str}
+        elif tx_type == 'Expense' and category == 'Loan & Debt' and not has_loans:
+            desc = str(description)
+            if not desc.startswith('[PAID]') and not is_repayment(desc.lower()):
+                has_loans = True
+
+        if str(row_month)[:10] == month:
+            person = person or 'Joint'
+            amt = to_number(amount)
             if tx_type == 'Income':
-                income[person] = income.get(person, 0) + amount
+                income[person] = income.get(person, 0) + amt
             elif tx_type == 'Expense':
-                expenses[person] = expenses.get(person, 0) + amount
-    
-    return {
+                expenses[person] = expenses.get(person, 0) + amt
+
+    summary = {
         'month': month,
         'income': income,
         'expenses': expenses,
         'total_income': sum(income.values()),
         'total_expenses': sum(expenses.values())
     }
+    return funds, summary, has_loans
 
 # ============== UNIVERSAL UNDO HANDLER ==============
 
@@ -1423,6 +1707,7 @@ def perform_undo(channel_id):
                 else:
                     # Restore old amount
                     sheet.update_cell(data['row_index'], 4, data['old_amount'])
+                clear_sheet_cache()
                 clear_undo_action(channel_id)
                 return True, f"↩️ {data['fund_name']} restored to {fmt(data['old_amount'])}"
             except Exception as e:
@@ -1437,6 +1722,7 @@ def perform_undo(channel_id):
                 rows_to_delete = sorted(data['rows'], key=lambda x: x['row_index'], reverse=True)
                 for row_info in rows_to_delete:
                     sheet.delete_rows(row_info['row_index'])
+                clear_sheet_cache()
                 clear_undo_action(channel_id)
                 return True, f"↩️ Fund allocation undone ({len(rows_to_delete)} entries removed)"
             except Exception as e:
@@ -1445,666 +1731,313 @@ def perform_undo(channel_id):
 
     return False, "Unknown action type"
 
-# ============== SLACK EVENT HANDLER ==============
+# ============== COMMAND HANDLERS ==============
 
-@app.route('/slack/events', methods=['POST'])
-def slack_events():
-    if not signature_verifier.is_valid_request(request.get_data(), request.headers):
-        return jsonify({'error': 'invalid request'}), 403
-    
-    data = request.json
-    
-    if data.get('type') == 'url_verification':
-        return jsonify({'challenge': data.get('challenge')})
-    
-    event = data.get('event', {})
-    event_type = event.get('type')
-    
-    if event.get('bot_id'):
-        return jsonify({'ok': True})
-    
-    event_id = event.get('client_msg_id') or event.get('event_ts') or data.get('event_id')
-    if is_duplicate_event(event_id):
-        return jsonify({'ok': True})
-    
-    if event_type == 'message':
-        channel = event.get('channel')
-        text = event.get('text', '').strip()
-        user_id = event.get('user')
-        
-        # Ignore messages directed at other bots (like @OpenClaw)
-        # Bot mentions at start look like: "<@U01234567> message..."
-        if re.match(r'^<@U[A-Z0-9]+>', text):
-            # If message STARTS with a mention, it's directed at another bot/user
-            # Finance Bot should not respond to these
-            return jsonify({'ok': True})
-        
-        user_name = detect_user_name(user_id)
-        
-        text_lower = text.lower()
-        
-        # Command: status
-        if text_lower in ['status', 'tình hình', 'báo cáo', 'check']:
-            funds = get_fund_status()
-            summary = get_monthly_summary()
-            has_loans = has_outstanding_loans()
-            
-            if funds or summary:
-                msg = "📊 *Status Update*\n\n"
-                
-                if summary:
-                    month_name = datetime.strptime(summary['month'], '%Y-%m-%d').strftime('%B %Y')
-                    msg += f"*{month_name}:*\n"
-                    msg += f"• Income: {fmt(summary['total_income'])}\n"
-                    msg += f"• Expenses: {fmt(summary['total_expenses'])}\n"
-                    net = summary['total_income'] - summary['total_expenses']
-                    msg += f"• Net: {fmt(net)}\n\n"
-                
-                if funds:
-                    msg += "*Fund Balances:*\n"
-                    for fund, fdata in funds.items():
-                        msg += f"• {fund}: {fmt(fdata['amount'])}\n"
-                    
-                    emergency = funds.get('Emergency Fund', {}).get('amount', 0)
-                    if emergency:
-                        progress = (emergency / 15000000) * 100
-                        msg += f"\n🎯 Emergency Fund: {progress:.1f}% → ₩15M"
-                
-                if has_loans:
-                    msg += "\n\n⚠️ Check Loan - Debt → `list debt`"
-                
-                slack_client.chat_postMessage(channel=channel, text=msg)
-            else:
-                slack_client.chat_postMessage(channel=channel, text="❌ Cannot fetch status")
-        
-        # Command: bills
-        elif text_lower in ['bills', 'fixed', 'fixed bills']:
-            bills = get_fixed_bills_dict()
-            msg = "📋 *Fixed Bills (Active):*\n\n"
-            
-            jacob_bills, naomi_bills, joint_bills = [], [], []
-            seen = set()
-            total = 0
-            
-            for key, bill in bills.items():
-                cat = bill['category']
-                if cat in seen:
-                    continue
-                seen.add(cat)
-                
-                amt = bill['amount']
-                total += amt
-                line = f"• {cat}: {fmt(amt)}"
-                
-                if bill['person'] == 'Jacob':
-                    jacob_bills.append(line)
-                elif bill['person'] == 'Naomi':
-                    naomi_bills.append(line)
-                else:
-                    joint_bills.append(line)
-            
-            if joint_bills:
-                msg += "*Joint:*\n" + "\n".join(joint_bills) + "\n\n"
-            if jacob_bills:
-                msg += "*Jacob:*\n" + "\n".join(jacob_bills) + "\n\n"
-            if naomi_bills:
-                msg += "*Naomi:*\n" + "\n".join(naomi_bills) + "\n\n"
-            
-            msg += f"*Total: {fmt(total)}*"
-            slack_client.chat_postMessage(channel=channel, text=msg)
-
-        # Command: Fund calculator
-        elif text_lower in ['fund', 'quỹ', 'quy', 'tính quỹ', 'tinh quy']:
-            sheet = get_transaction_sheet()
-            if not sheet:
-                slack_client.chat_postMessage(channel=channel, text="❌ Không thể kết nối sheet")
-                return jsonify({'ok': True})
-
-            now = datetime.now()
-            current_month = now.strftime('%Y-%m-01')
-
-            records = sheet.get_all_records()
-
-            # Calculate income by person
-            income_jacob = 0
-            income_naomi = 0
-            income_other = 0
-            jacob_salary_amount = 0
-            naomi_salary_amount = 0
-            naomi_commission_amount = 0
-
-            # Calculate business costs
-            business_costs = 0
-            ads_naomi_amount = 0
-            jacob_fee_amount = 0
-            chi_duong_amount = 0
-
-            # Calculate joint expenses
-            joint_expenses = 0
-
-            for row in records:
-                row_month = str(row.get('Month', ''))[:10]
-                if row_month != current_month:
-                    continue
+def handle_status(channel):
+    funds, summary, has_loans = get_status_snapshot()
 
-                tx_type = row.get('Type', '')
-                category = row.get('Category', '')
-                person = row.get('Person', '')
-                amount = row.get('Amount', 0) or 0
-                description = str(row.get('Description', '')).lower()
-
-                # Income tracking
-                if tx_type == 'Income':
-                    if person == 'Jacob':
-                        income_jacob += amount
-                        if 'salary' in description or 'lương' in description:
-                            jacob_salary_amount += amount
-                    elif person == 'Naomi':
-                        income_naomi += amount
-                        if 'salary' in description or 'lương' in description:
-                            naomi_salary_amount += amount
-                        if 'commission' in description or 'hoa hồng' in description:
-                            naomi_commission_amount += amount
-                    else:
-                        income_other += amount
-
-                # Business costs tracking
-                if tx_type == 'Expense' and category == 'Business':
-                    business_costs += amount
-                    if 'ads' in description or 'quảng cáo' in description:
-                        ads_naomi_amount += amount
-                    if 'jacob' in description or 'gởi jacob' in description or 'fee' in description:
-                        jacob_fee_amount += amount
-                    if 'dương' in description or 'duong' in description:
-                        chi_duong_amount += amount
-
-                # Joint expenses tracking
-                if tx_type == 'Expense' and person == 'Joint':
-                    joint_expenses += amount
-
-            total_income = income_jacob + income_naomi + income_other
-
-            # Fixed expenses (set amount - user can update with command later)
-            fixed_expenses = 3300000  # ₩3.3M default
-
-            # Net pool calculation
-            net_pool = total_income - fixed_expenses - business_costs - joint_expenses
-
-            # Fund allocation (40/30/20/10)
-            alloc_emergency = int(net_pool * 0.40)
-            alloc_investment = int(net_pool * 0.30)
-            alloc_planning = int(net_pool * 0.20)
-            alloc_date = int(net_pool * 0.10)
-
-            # Build response
-            month_name = now.strftime('%B %Y')
-            msg = f"📊 *Fund Calculator - {month_name}*\n\n"
-
-            # Income section
-            msg += "💵 *INCOME:*\n"
-            if jacob_salary_amount > 0:
-                msg += f"✅ Jacob Salary: {fmt(jacob_salary_amount)}\n"
-            else:
-                msg += f"❓ Jacob Salary: _chưa nhập_ → `jacob salary 2.8M`\n"
+    if funds or summary:
+        # Collect lines and join once instead of repeated string concat
+        parts = ["📊 *Status Update*\n\n"]
 
-            if naomi_salary_amount > 0:
-                msg += f"✅ Naomi Salary: {fmt(naomi_salary_amount)}\n"
-            else:
-                msg += f"❓ Naomi Salary: _chưa nhập_ → `naomi salary 2M`\n"
+        if summary:
+            # Month is always 'YYYY-MM-01' - slice it rather than strptime
+            month_name = f"{MONTH_FULL_NAMES[int(summary['month'][5:7]) - 1]} {summary['month'][:4]}"
+            parts.append(f"*{month_name}:*\n")
+            parts.append(f"• Income: {fmt(summary['total_income'])}\n")
+            parts.append(f"• Expenses: {fmt(summary['total_expenses'])}\n")
+            net = summary['total_income'] - summary['total_expenses']
+            parts.append(f"• Net: {fmt(net)}\n\n")
 
-            if naomi_commission_amount > 0:
-                msg += f"✅ Naomi Commission: {fmt(naomi_commission_amount)}\n"
-            else:
-                msg += f"❓ Naomi Commission: _chưa nhập_ → `naomi commission 5M`\n"
+        if funds:
+            parts.append("*Fund Balances:*\n")
+            for fund, fdata in funds.items():
+                parts.append(f"• {fund}: {fmt(fdata['amount'])}\n")
 
-            if income_other > 0:
-                msg += f"✅ Other: {fmt(income_other)}\n"
+            emergency = funds.get('Emergency Fund', {}).get('amount', 0)
+            if emergency:
+                progress = (emergency / 15000000) * 100
+                parts.append(f"\n🎯 Emergency Fund: {progress:.1f}% → ₩15M")
 
-            msg += f"📝 *Total Income: {fmt(total_income)}*\n\n"
+        if has_loans:
+            parts.append("\n\n⚠️ Check Loan - Debt → `list debt`")
 
-            # Fixed expenses
-            msg += f"💸 *FIXED EXPENSES:* {fmt(fixed_expenses)}\n\n"
+        post_message(channel, "".join(parts))
+    else:
+        post_message(channel, "❌ Cannot fetch status")
 
-            # Business costs section
-            msg += "💼 *BUSINESS COSTS:*\n"
-            if ads_naomi_amount > 0:
-                msg += f"✅ Ads Naomi: {fmt(ads_naomi_amount)}\n"
-            else:
-                msg += f"❓ Ads Naomi? → `50K ads naomi`\n"
+def handle_bills(channel):
+    bills, _, _ = get_fixed_bills()
+    parts = ["📋 *Fixed Bills (Active):*\n\n"]
 
-            if jacob_fee_amount > 0:
-                msg += f"✅ Jacob Fee: {fmt(jacob_fee_amount)}\n"
-            else:
-                msg += f"❓ Jacob Fee? → `800K gởi jacob`\n"
+    jacob_bills, naomi_bills, joint_bills = [], [], []
+    total = 0
 
-            if chi_duong_amount > 0:
-                msg += f"✅ Chị Dương: {fmt(chi_duong_amount)}\n"
-            else:
-                msg += f"❓ Chị Dương? → `500K chị dương`\n"
-
-            msg += f"📝 *Total Business: {fmt(business_costs)}*\n\n"
-
-            # Joint expenses
-            if joint_expenses > 0:
-                msg += f"🛒 *JOINT EXPENSES:* {fmt(joint_expenses)}\n\n"
-
-            # Net pool
-            msg += "───────────────\n"
-            msg += f"💰 *NET POOL: {fmt(net_pool)}*\n\n"
-
-            # Suggested allocation
-            msg += "*Suggested Allocation (40/30/20/10):*\n"
-            msg += f"• 🎯 Emergency: {fmt(alloc_emergency)}\n"
-            msg += f"• 📈 Investment: {fmt(alloc_investment)}\n"
-            msg += f"• 🏠 Planning: {fmt(alloc_planning)}\n"
-            msg += f"• 💕 Date: {fmt(alloc_date)}\n\n"
-
-            # Actions
-            msg += "✅ Apply suggested? → `fund apply`\n"
-            msg += f"✏️ Custom amounts? → `fund apply {fmt(alloc_emergency)} {fmt(alloc_investment)} {fmt(alloc_planning)} {fmt(alloc_date)}`"
-
-            # Store allocation for fund apply command
-            store_undo_action(channel, 'fund_calc', {
-                'emergency': alloc_emergency,
-                'investment': alloc_investment,
-                'planning': alloc_planning,
-                'date': alloc_date
-            })
+    for cat, bill in bills.items():
+        amt = bill.amount
+        total += amt
+        line = f"• {cat}: {fmt(amt)}"
 
-            slack_client.chat_postMessage(channel=channel, text=msg)
-
-        # Command: Fund apply
-        elif text_lower.startswith('fund apply') or text_lower.startswith('áp dụng quỹ') or text_lower.startswith('ap dung quy'):
-            sheet = get_transaction_sheet()
-            if not sheet:
-                slack_client.chat_postMessage(channel=channel, text="❌ Không thể kết nối sheet")
-                return jsonify({'ok': True})
-
-            now = datetime.now()
-
-            # Check if custom amounts provided: "fund apply 2.5M 1.8M 1M 500K"
-            # Remove the command prefix
-            amounts_text = text_lower.replace('fund apply', '').replace('áp dụng quỹ', '').replace('ap dung quy', '').strip()
-
-            custom_amounts = []
-            if amounts_text:
-                # Parse custom amounts
-                parts = amounts_text.replace(',', ' ').split()
-                for part in parts:
-                    amt = parse_amount(part)
-                    if amt:
-                        custom_amounts.append(amt)
-
-            if len(custom_amounts) == 4:
-                # Use custom amounts
-                alloc_emergency = custom_amounts[0]
-                alloc_investment = custom_amounts[1]
-                alloc_planning = custom_amounts[2]
-                alloc_date = custom_amounts[3]
-                is_custom = True
-            else:
-                # Get suggested amounts from last fund calculation
-                action, error = get_undo_action(channel)
-                if not action or action.get('type') != 'fund_calc':
-                    slack_client.chat_postMessage(channel=channel, text="❓ Chạy `fund` trước để tính toán, hoặc nhập số tiền:\n`fund apply 2.5M 1.8M 1M 500K`\n(Emergency, Investment, Planning, Date)")
-                    return jsonify({'ok': True})
-
-                calc_data = action['data']
-                alloc_emergency = calc_data['emergency']
-                alloc_investment = calc_data['investment']
-                alloc_planning = calc_data['planning']
-                alloc_date = calc_data['date']
-                is_custom = False
-
-            # Validate - don't apply negative amounts
-            if alloc_emergency < 0 or alloc_investment < 0 or alloc_planning < 0 or alloc_date < 0:
-                slack_client.chat_postMessage(channel=channel, text="❌ Không thể áp dụng số âm. Kiểm tra lại income và expenses.")
-                return jsonify({'ok': True})
-
-            # Log each fund allocation as "Fund Add"
-            fund_allocations = [
-                ('Emergency Fund', '🎯', alloc_emergency),
-                ('Investment Fund', '📈', alloc_investment),
-                ('Planning Fund', '🏠', alloc_planning),
-                ('Date Fund', '💕', alloc_date),
-            ]
-
-            # Get old Emergency Fund balance for milestone check
-            old_funds = get_fund_status()
-            old_emergency_balance = old_funds.get('Emergency Fund', {}).get('amount', 0)
-
-            added_rows = []
-            for fund_name, emoji, amount in fund_allocations:
-                if amount > 0:
-                    row_data = [
-                        now.strftime('%Y-%m-%d'),
-                        'Fund Add',
-                        fund_name,
-                        amount,
-                        f'Monthly allocation - {now.strftime("%b %Y")}',
-                        'Joint',
-                        now.strftime('%Y-%m-01'),
-                        'slack'
-                    ]
-                    sheet.append_row(row_data)
-
-                    # Track for undo
-                    all_values = sheet.get_all_values()
-                    added_rows.append({
-                        'row_index': len(all_values),
-                        'fund_name': fund_name,
-                        'amount': amount
-                    })
+        if bill.person == 'Jacob':
+            jacob_bills.append(line)
+        elif bill.person == 'Naomi':
+            naomi_bills.append(line)
+        else:
+            joint_bills.append(line)
 
-            # Store for undo
-            store_undo_action(channel, 'fund_apply', {'rows': added_rows})
+    if joint_bills:
+        parts.append("*Joint:*\n" + "\n".join(joint_bills) + "\n\n")
+    if jacob_bills:
+        parts.append("*Jacob:*\n" + "\n".join(jacob_bills) + "\n\n")
+    if naomi_bills:
+        parts.append("*Naomi:*\n" + "\n".join(naomi_bills) + "\n\n")
 
-            # Get updated fund balances
-            funds = get_fund_status()
+    parts.append(f"*Total: {fmt(total)}*")
+    post_message(channel, "".join(parts))
 
-            # Build response
-            msg = "✅ *Fund Allocation Applied!*\n\n"
+def handle_fund(channel):
+    sheet = get_transaction_sheet()
+    if not sheet:
+        post_message(channel, "❌ Không thể kết nối sheet")
+        return
 
-            if is_custom:
-                msg += "📝 Custom amounts:\n"
-            else:
-                msg += "📝 Suggested amounts (40/30/20/10):\n"
-
-            total_allocated = 0
-            for fund_name, emoji, amount in fund_allocations:
-                if amount > 0:
-                    new_balance = funds.get(fund_name, {}).get('amount', 0)
-                    msg += f"{emoji} {fund_name}: +{fmt(amount)} → {fmt(new_balance)}\n"
-                    total_allocated += amount
-
-            msg += f"\n💰 Total allocated: {fmt(total_allocated)}\n"
-
-            # Emergency fund progress
-            emergency_balance = funds.get('Emergency Fund', {}).get('amount', 0)
-            progress = (emergency_balance / 15000000) * 100
-            msg += f"\n🎯 Emergency Fund: {progress:.1f}% → ₩15M"
-
-            # Check for milestone
-            milestone_msg = check_milestone('Emergency Fund', old_emergency_balance, emergency_balance)
-            if milestone_msg:
-                msg += f"\n\n{milestone_msg}"
-                wisdom = get_wisdom('milestone')
-                if wisdom:
-                    msg += f"\n{wisdom}"
-            elif progress >= 100:
-                msg += "\n🎊 CONGRATULATIONS! Freedom achieved! 🎊"
-            elif progress >= 75:
-                msg += "\n🔥 Almost there! Keep going!"
-            elif progress >= 50:
-                msg += "\n💪 Halfway to freedom!"
-
-            slack_client.chat_postMessage(channel=channel, text=msg)
-
-        # Command: list debt / list loan (MUST be before general 'list' check)
-        elif text_lower in ['list debt', 'list loan', 'list nợ', 'list mượn', 'debt', 'loan']:
-            loans = get_outstanding_loans()
-            if loans:
-                last_debt_list[channel] = loans
-                msg = format_transaction_list(loans, "Loan & Debt", channel, is_debt_list=True)
-            else:
-                msg = "📋 No outstanding loans/debts! 🎉"
-            slack_client.chat_postMessage(channel=channel, text=msg)
-        
-        # Command: paid (mark loan as paid)
-        elif text_lower.startswith('paid'):
-            parts = text_lower.split()
-            if len(parts) < 2 or not parts[1].isdigit():
-                slack_client.chat_postMessage(channel=channel, text="❓ Usage: `paid 1` (mark loan #1 as paid)")
-                return jsonify({'ok': True})
-            
-            loan_index = int(parts[1]) - 1
-            success, result, undo_data = mark_loan_as_paid(loan_index, channel)
-            
-            if success:
-                # Store for undo
-                store_undo_action(channel, 'paid', undo_data)
-                
-                msg = f"✅ Paid: {fmt(result['amount'])} - {result['description']}\n"
-                msg += f"💰 Logged as income: nhận lại/trả nợ"
-                slack_client.chat_postMessage(channel=channel, text=msg)
-            else:
-                slack_client.chat_postMessage(channel=channel, text=f"❌ {result}")
-        
-        # Command: list (general)
-        elif text_lower.startswith('list') or text_lower.startswith('last'):
-            if text_lower.startswith('last'):
-                words = text_lower.split()
-                limit = int(words[1]) if len(words) > 1 and words[1].isdigit() else 5
-                filter_type, filter_category, filter_person, filter_month, _ = None, None, None, None, limit
-            else:
-                filter_type, filter_category, filter_person, filter_month, limit = parse_list_command(text_lower)
-            
-            transactions = get_all_transactions()
-            filtered = filter_transactions(transactions, filter_type, filter_category, filter_person, filter_month, limit)
-            
-            title_parts = []
-            if filter_category:
-                title_parts.append(filter_category.title())
-            if filter_type:
-                title_parts.append(filter_type)
-            if filter_person:
-                title_parts.append(filter_person)
-            if filter_month:
-                try:
-                    month_obj = datetime.strptime(filter_month, '%Y-%m')
-                    title_parts.append(month_obj.strftime('%B %Y'))
-                except:
-                    title_parts.append(filter_month)
-            if limit:
-                title_parts.append(f"Last {limit}")
-            
-            title = ' - '.join(title_parts) if title_parts else 'All Transactions'
-            
-            msg = format_transaction_list(filtered, title, channel)
-            slack_client.chat_postMessage(channel=channel, text=msg)
-        
-        # Command: delete
-        elif text_lower.startswith('delete'):
-            target_str = text_lower.replace('delete', '').strip()
-            
-            if not target_str:
-                slack_client.chat_postMessage(channel=channel, text="❓ Usage: `delete 1` or `delete 1,2,3` or `delete 1-5` or `delete last`")
-                return jsonify({'ok': True})
-            
-            targets = parse_delete_targets(target_str)
-            
-            if not targets:
-                slack_client.chat_postMessage(channel=channel, text="❓ Invalid format. Use: `delete 1` or `delete 1,2,3` or `delete 1-5`")
-                return jsonify({'ok': True})
-            
-            success, message, deleted_items, deleted_rows_data = delete_transactions(targets, channel)
-            
-            if success:
-                # Store for undo
-                store_undo_action(channel, 'delete', deleted_rows_data)
-                
-                if len(deleted_items) == 1:
-                    msg = f"🗑️ Deleted: {deleted_items[0]['category']} - {fmt(deleted_items[0]['amount'])}\n"
-                else:
-                    msg = f"🗑️ Deleted {len(deleted_items)} items:\n"
-                    for item in deleted_items[:5]:
-                        msg += f"  • {item['category']} - {fmt(item['amount'])}\n"
-                    if len(deleted_items) > 5:
-                        msg += f"  ... and {len(deleted_items) - 5} more\n"
-                msg += "↩️ To undo: `undo`"
-                slack_client.chat_postMessage(channel=channel, text=msg)
-            else:
-                slack_client.chat_postMessage(channel=channel, text=f"❌ {message}")
-        
-        # Command: edit
-        elif text_lower.startswith('edit'):
-            words = text.split()
-            
-            if len(words) < 3:
-                slack_client.chat_postMessage(channel=channel, text="❓ Usage: `edit 1 150K`")
-                return jsonify({'ok': True})
-            
-            target = words[1]
-            new_amount_str = words[2]
-            
-            if not target.isdigit():
-                slack_client.chat_postMessage(channel=channel, text="❓ Usage: `edit 1 150K`")
-                return jsonify({'ok': True})
-            
-            idx = int(target) - 1
-            if channel not in last_list_results or idx >= len(last_list_results[channel]):
-                slack_client.chat_postMessage(channel=channel, text="❌ Invalid number. Use `list` first")
-                return jsonify({'ok': True})
-            
-            tx_to_edit = last_list_results[channel][idx]
-            new_amount = parse_amount(new_amount_str)
-            
-            if not new_amount:
-                slack_client.chat_postMessage(channel=channel, text="❌ Invalid amount")
-                return jsonify({'ok': True})
-            
-            success, old_value, edit_data = edit_transaction(tx_to_edit['row_index'], new_amount)
-            
-            if success:
-                # Store for undo
-                store_undo_action(channel, 'edit', edit_data)
-                
-                msg = f"✏️ Updated: {tx_to_edit['category']}\n"
-                msg += f"   {fmt(int(float(old_value)))} → {fmt(new_amount)}"
-                slack_client.chat_postMessage(channel=channel, text=msg)
+    now = datetime.now()
+    current_month = now.strftime('%Y-%m-01')
+
+    rows = get_transaction_rows()
+
+    # Calculate income by person
+    income_jacob = 0
+    income_naomi = 0
+    income_other = 0
+    jacob_salary_amount = 0
+    naomi_salary_amount = 0
+    naomi_commission_amount = 0
+
+    # Calculate business costs
+    business_costs = 0
+    ads_naomi_amount = 0
+    jacob_fee_amount = 0
+    chi_duong_amount = 0
+
+    # Calculate joint expenses
+    joint_expenses = 0
+
+    for row in rows:
+        if len(row) < 7:
+            continue
+
+        row_month = str(row[6])[:10]
+        if row_month != current_month:
+            continue
+
+        tx_type = row[1]
+        category = row[2]
+        person = row[5]
+        amount = to_number(row[3])
+        description = str(row[4]).lower()
+
+        # Income tracking
+        if tx_type == 'Income':
+            if person == 'Jacob':
+                income_jacob += amount
+                if 'salary' in description or 'lương' in description:
+                    jacob_salary_amount += amount
+            elif person == 'Naomi':
+                income_naomi += amount
+                if 'salary' in description or 'lương' in description:
+                    naomi_salary_amount += amount
+                if 'commission' in description or 'hoa hồng' in description:
+                    naomi_commission_amount += amount
             else:
-                slack_client.chat_postMessage(channel=channel, text=f"❌ Error: {old_value}")
-        
-        # Command: undo (universal)
-        elif text_lower == 'undo':
-            success, message = perform_undo(channel)
-            slack_client.chat_postMessage(channel=channel, text=message if success else f"❌ {message}")
-
-        # Command: Settings
-        elif text_lower in ['settings', 'cài đặt', 'cai dat']:
-            spending = get_monthly_spending_by_category()
-            now = datetime.now()
-            month_name = now.strftime('%B %Y')
-
-            msg = f"⚙️ *CÀI ĐẶT - {month_name}*\n\n"
-
-            msg += "💰 *NGÂN SÁCH THÁNG:*\n"
-            for category, budget in DEFAULT_BUDGETS.items():
-                spent = spending.get(category, 0)
-                percentage = (spent / budget * 100) if budget > 0 else 0
-
-                if percentage >= 100:
-                    status = "🚨"
-                elif percentage >= 80:
-                    status = "⚠️"
-                else:
-                    status = "✅"
+                income_other += amount
+
+        # Business costs tracking
+        if tx_type == 'Expense' and category == 'Business':
+            business_costs += amount
+            if 'ads' in description or 'quảng cáo' in description:
+                ads_naomi_amount += amount
+            if 'jacob' in description or 'gởi jacob' in description or 'fee' in description:
+                jacob_fee_amount += amount
+            if 'dương' in description or 'duong' in description:
+                chi_duong_amount += amount
+
+        # Joint expenses tracking
+        if tx_type == 'Expense' and person == 'Joint':
+            joint_expenses += amount
+
+    total_income = income_jacob + income_naomi + income_other
+
+    # Fixed expenses (set amount - user can update with command later)
+    fixed_expenses = 3300000  # ₩3.3M default
+
+    # Net pool calculation
+    net_pool = total_income - fixed_expenses - business_costs - joint_expenses
+
+    # Fund allocation (40/30/20/10)
+    alloc_emergency = int(net_pool * 0.40)
+    alloc_investment = int(net_pool * 0.30)
+    alloc_planning = int(net_pool * 0.20)
+    alloc_date = int(net_pool * 0.10)
+
+    # Build response
+    month_name = now.strftime('%B %Y')
+    msg = f"📊 *Fund Calculator - {month_name}*\n\n"
+
+    # Income section
+    msg += "💵 *INCOME:*\n"
+    if jacob_salary_amount > 0:
+        msg += f"✅ Jacob Salary: {fmt(jacob_salary_amount)}\n"
+    else:
+        msg += f"❓ Jacob Salary: _chưa nhập_ → `jacob salary 2.8M`\n"
 
-                msg += f"{status} {category}: {fmt(spent)} / {fmt(budget)} ({percentage:.0f}%)\n"
+    if naomi_salary_amount > 0:
+        msg += f"✅ Naomi Salary: {fmt(naomi_salary_amount)}\n"
+    else:
+        msg += f"❓ Naomi Salary: _chưa nhập_ → `naomi salary 2M`\n"
 
-            msg += f"\n🎭 *PERSONALITY:*\n"
-            msg += f"• Tone: Vietnamese Mix 🇻🇳\n"
-            msg += f"• Wisdom: 50% (balanced)\n"
-            msg += f"• Celebrations: On 🎉\n"
-            msg += f"• Warnings: On ⚠️\n"
+    if naomi_commission_amount > 0:
+        msg += f"✅ Naomi Commission: {fmt(naomi_commission_amount)}\n"
+    else:
+        msg += f"❓ Naomi Commission: _chưa nhập_ → `naomi commission 5M`\n"
 
-            msg += f"\n✏️ Change budget: `set budget dining 300K`"
+    if income_other > 0:
+        msg += f"✅ Other: {fmt(income_other)}\n"
 
-            slack_client.chat_postMessage(channel=channel, text=msg)
+    msg += f"📝 *Total Income: {fmt(total_income)}*\n\n"
 
-        # Command: Budgets quick view
-        elif text_lower in ['budgets', 'ngân sách', 'ngan sach', 'budget']:
-            spending = get_monthly_spending_by_category()
+    # Fixed expenses
+    msg += f"💸 *FIXED EXPENSES:* {fmt(fixed_expenses)}\n\n"
 
-            msg = "💰 *NGÂN SÁCH THÁNG NÀY:*\n\n"
+    # Business costs section
+    msg += "💼 *BUSINESS COSTS:*\n"
+    if ads_naomi_amount > 0:
+        msg += f"✅ Ads Naomi: {fmt(ads_naomi_amount)}\n"
+    else:
+        msg += f"❓ Ads Naomi? → `50K ads naomi`\n"
 
-            total_budget = 0
-            total_spent = 0
+    if jacob_fee_amount > 0:
+        msg += f"✅ Jacob Fee: {fmt(jacob_fee_amount)}\n"
+    else:
+        msg += f"❓ Jacob Fee? → `800K gởi jacob`\n"
 
-            for category, budget in DEFAULT_BUDGETS.items():
-                spent = spending.get(category, 0)
-                percentage = (spent / budget * 100) if budget > 0 else 0
+    if chi_duong_amount > 0:
+        msg += f"✅ Chị Dương: {fmt(chi_duong_amount)}\n"
+    else:
+        msg += f"❓ Chị Dương? → `500K chị dương`\n"
 
-                total_budget += budget
-                total_spent += spent
+    msg += f"📝 *Total Business: {fmt(business_costs)}*\n\n"
 
-                if percentage >= 100:
-                    bar = "🔴"
-                elif percentage >= 80:
-                    bar = "🟡"
-                else:
-                    bar = "🟢"
+    # Joint expenses
+    if joint_expenses > 0:
+        msg += f"🛒 *JOINT EXPENSES:* {fmt(joint_expenses)}\n\n"
 
-                msg += f"{bar} {category}: {fmt(spent)} / {fmt(budget)}\n"
+    # Net pool
+    msg += "───────────────\n"
+    msg += f"💰 *NET POOL: {fmt(net_pool)}*\n\n"
 
-            msg += f"\n───────────────\n"
-            msg += f"📊 Tổng: {fmt(total_spent)} / {fmt(total_budget)}\n"
+    # Suggested allocation
+    msg += "*Suggested Allocation (40/30/20/10):*\n"
+    msg += f"• 🎯 Emergency: {fmt(alloc_emergency)}\n"
+    msg += f"• 📈 Investment: {fmt(alloc_investment)}\n"
+    msg += f"• 🏠 Planning: {fmt(alloc_planning)}\n"
+    msg += f"• 💕 Date: {fmt(alloc_date)}\n\n"
 
-            remaining_total = total_budget - total_spent
-            if remaining_total > 0:
-                msg += f"✅ Còn lại: {fmt(remaining_total)}"
-            else:
-                msg += f"🚨 Vượt: {fmt(abs(remaining_total))}"
-
-            slack_client.chat_postMessage(channel=channel, text=msg)
-
-        # Command: Set budget
-        elif text_lower.startswith('set budget') or text_lower.startswith('đặt ngân sách'):
-            # Parse: "set budget dining 300K" or "set budget Food & Dining 300000"
-            parts = text.split()
-
-            if len(parts) < 4:
-                slack_client.chat_postMessage(channel=channel, text="❓ Cách dùng: `set budget dining 300K`\n\nCategories: dining, groceries, entertainment, shopping, transport, business, healthcare, gift")
-                return jsonify({'ok': True})
-
-            # Map short names to full category names (English + Vietnamese)
-            category_map = {
-                # Food & Dining
-                'dining': 'Food & Dining', 'food': 'Food & Dining', 'ăn': 'Food & Dining',
-                'ăn uống': 'Food & Dining', 'đồ ăn': 'Food & Dining', 'cơm': 'Food & Dining',
-                # Groceries
-                'groceries': 'Groceries', 'grocery': 'Groceries', 'chợ': 'Groceries',
-                'siêu thị': 'Groceries', 'rau': 'Groceries', 'thực phẩm': 'Groceries',
-                # Entertainment
-                'entertainment': 'Entertainment', 'giải trí': 'Entertainment', 'vui chơi': 'Entertainment',
-                # Shopping
-                'shopping': 'Shopping', 'mua sắm': 'Shopping', 'mua': 'Shopping',
-                # Transport
-                'transport': 'Transport', 'xe': 'Transport', 'đi lại': 'Transport', 'xăng': 'Transport',
-                # Business
-                'business': 'Business', 'kinh doanh': 'Business', 'công việc': 'Business',
-                # Healthcare
-                'healthcare': 'Healthcare', 'health': 'Healthcare', 'sức khỏe': 'Healthcare',
-                'thuốc': 'Healthcare', 'y tế': 'Healthcare',
-                # Gift
-                'gift': 'Gift', 'quà': 'Gift', 'tặng': 'Gift',
-            }
+    # Actions
+    msg += "✅ Apply suggested? → `fund apply`\n"
+    msg += f"✏️ Custom amounts? → `fund apply {fmt(alloc_emergency)} {fmt(alloc_investment)} {fmt(alloc_planning)} {fmt(alloc_date)}`"
+
+    # Store allocation for fund apply command
+    store_undo_action(channel, 'fund_calc', {
+        'emergency': alloc_emergency,
+        'investment': alloc_investment,
+        'planning': alloc_planning,
+        'date': alloc_date
+    })
 
-            category_input = parts[2].lower()
-            category = category_map.get(category_input)
+    post_message(channel, msg)
 
-            if not category:
-                slack_client.chat_postMessage(channel=channel, text=f"❓ Không tìm thấy category '{category_input}'\n\nCategories: dining/ăn, groceries/chợ, entertainment/giải trí, shopping/mua sắm, transport/xe, business, healthcare/sức khỏe, gift/quà")
-                return jsonify({'ok': True})
+def handle_list_debt(channel):
+    loans = get_outstanding_loans()
+    if loans:
+        last_debt_list[channel] = loans
+        msg = format_transaction_list(loans, "Loan & Debt", channel, is_debt_list=True)
+    else:
+        msg = "📋 No outstanding loans/debts! 🎉"
+    post_message(channel, msg)
 
-            amount = parse_amount(parts[3])
-            if not amount:
-                slack_client.chat_postMessage(channel=channel, text=f"❓ Số tiền không hợp lệ: '{parts[3]}'\n\nVí dụ: `set budget dining 300K`")
-                return jsonify({'ok': True})
+def handle_undo(channel):
+    success, message = perform_undo(channel)
+    post_message(channel, message if success else f"❌ {message}")
 
-            # Update budget (in memory)
-            old_budget = DEFAULT_BUDGETS.get(category, 0)
-            DEFAULT_BUDGETS[category] = amount
+def handle_settings(channel):
+    spending = get_monthly_spending_by_category()
+    now = datetime.now()
+    month_name = now.strftime('%B %Y')
 
-            msg = f"✅ Đã cập nhật ngân sách!\n\n"
-            msg += f"📝 {category}: {fmt(old_budget)} → {fmt(amount)}\n"
-            msg += f"\n💡 Xem tất cả: `budgets`"
+    msg = f"⚙️ *CÀI ĐẶT - {month_name}*\n\n"
 
-            slack_client.chat_postMessage(channel=channel, text=msg)
+    msg += "💰 *NGÂN SÁCH THÁNG:*\n"
+    for category, budget in DEFAULT_BUDGETS.items():
+        spent = spending.get(category, 0)
+        percentage = (spent / budget * 100) if budget > 0 else 0
 
-        # Command: help
-        elif text_lower in ['help', 'trợ giúp', '?']:
-            help_msg = """🤖 *Finance Bot V5.2*
+        if percentage >= 100:
+            status = "🚨"
+        elif percentage >= 80:
+            status = "⚠️"
+        else:
+            status = "✅"
+
+        msg += f"{status} {category}: {fmt(spent)} / {fmt(budget)} ({percentage:.0f}%)\n"
+
+    msg += f"\n🎭 *PERSONALITY:*\n"
+    msg += f"• Tone: Vietnamese Mix 🇻🇳\n"
+    msg += f"• Wisdom: 50% (balanced)\n"
+    msg += f"• Celebrations: On 🎉\n"
+    msg += f"• Warnings: On ⚠️\n"
+
+    msg += f"\n✏️ Change budget: `set budget dining 300K`"
+
+    post_message(channel, msg)
+
+def handle_budgets(channel):
+    spending = get_monthly_spending_by_category()
+
+    msg = "💰 *NGÂN SÁCH THÁNG NÀY:*\n\n"
+
+    total_budget = 0
+    total_spent = 0
+
+    for category, budget in DEFAULT_BUDGETS.items():
+        spent = spending.get(category, 0)
+        percentage = (spent / budget * 100) if budget > 0 else 0
+
+        total_budget += budget
+        total_spent += spent
+
+        if percentage >= 100:
+            bar = "🔴"
+        elif percentage >= 80:
+            bar = "🟡"
+        else:
+            bar = "🟢"
+
+        msg += f"{bar} {category}: {fmt(spent)} / {fmt(budget)}\n"
+
+    msg += f"\n───────────────\n"
+    msg += f"📊 Tổng: {fmt(total_spent)} / {fmt(total_budget)}\n"
+
+    remaining_total = total_budget - total_spent
+    if remaining_total > 0:
+        msg += f"✅ Còn lại: {fmt(remaining_total)}"
+    else:
+        msg += f"🚨 Vượt: {fmt(abs(remaining_total))}"
+
+    post_message(channel, msg)
+
+def handle_help(channel):
+    help_msg = """🤖 *Finance Bot V5.2*
 
 *➕ Add Transaction:*
 • `salary 2m` - Log income
@@ -2142,116 +2075,557 @@ def slack_events():
 • `settings` - Xem cài đặt
 • `budgets` - Xem ngân sách
 • `set budget dining 300K` - Đổi ngân sách"""
-            slack_client.chat_postMessage(channel=channel, text=help_msg)
+    post_message(channel, help_msg)
+
+# Exact-match commands dispatch through one dict lookup instead of a chain
+# of list-membership checks
+EXACT_COMMANDS = {
+    'status': handle_status, 'tình hình': handle_status, 'báo cáo': handle_status, 'check': handle_status,
+    'bills': handle_bills, 'fixed': handle_bills, 'fixed bills': handle_bills,
+    'fund': handle_fund, 'quỹ': handle_fund, 'quy': handle_fund, 'tính quỹ': handle_fund, 'tinh quy': handle_fund,
+    'list debt': handle_list_debt, 'list loan': handle_list_debt, 'list nợ': handle_list_debt,
+    'list mượn': handle_list_debt, 'debt': handle_list_debt, 'loan': handle_list_debt,
+    'undo': handle_undo,
+    'settings': handle_settings, 'cài đặt': handle_settings, 'cai dat': handle_settings,
+    'budgets': handle_budgets, 'ngân sách': handle_budgets, 'ngan sach': handle_budgets, 'budget': handle_budgets,
+    'help': handle_help, 'trợ giúp': handle_help, '?': handle_help,
+}
+
+def handle_fund_apply(channel, text, text_lower, now):
+    """fund apply - log the suggested or custom fund allocations"""
+    sheet = get_transaction_sheet()
+    if not sheet:
+        post_message(channel, "❌ Không thể kết nối sheet")
+        return
+
+    # Check if custom amounts provided: "fund apply 2.5M 1.8M 1M 500K"
+    # Remove the command prefix
+    amounts_text = text_lower.replace('fund apply', '').replace('áp dụng quỹ', '').replace('ap dung quy', '').strip()
+
+    custom_amounts = []
+    if amounts_text:
+        # Parse custom amounts
+        parts = amounts_text.replace(',', ' ').split()
+        for part in parts:
+            amt = parse_amount(part)
+            if amt:
+                custom_amounts.append(amt)
+
+    if len(custom_amounts) == 4:
+        # Use custom amounts
+        alloc_emergency = custom_amounts[0]
+        alloc_investment = custom_amounts[1]
+        alloc_planning = custom_amounts[2]
+        alloc_date = custom_amounts[3]
+        is_custom = True
+    else:
+        # Get suggested amounts from last fund calculation
+        action, error = get_undo_action(channel)
+        if not action or action.get('type') != 'fund_calc':
+            post_message(channel, "❓ Chạy `fund` trước để tính toán, hoặc nhập số tiền:\n`fund apply 2.5M 1.8M 1M 500K`\n(Emergency, Investment, Planning, Date)")
+            return
+
+        calc_data = action['data']
+        alloc_emergency = calc_data['emergency']
+        alloc_investment = calc_data['investment']
+        alloc_planning = calc_data['planning']
+        alloc_date = calc_data['date']
+        is_custom = False
+
+    # Validate - don't apply negative amounts
+    if alloc_emergency < 0 or alloc_investment < 0 or alloc_planning < 0 or alloc_date < 0:
+        post_message(channel, "❌ Không thể áp dụng số âm. Kiểm tra lại income và expenses.")
+        return
+
+    # Log each fund allocation as "Fund Add"
+    fund_allocations = [
+        ('Emergency Fund', '🎯', alloc_emergency),
+        ('Investment Fund', '📈', alloc_investment),
+        ('Planning Fund', '🏠', alloc_planning),
+        ('Date Fund', '💕', alloc_date),
+    ]
+
+    # Get old Emergency Fund balance for milestone check
+    old_funds = get_fund_status()
+    old_emergency_balance = old_funds.get('Emergency Fund', {}).get('amount', 0)
+
+    # Build all allocation rows and append them in one API call
+    rows_to_add = []
+    applied = []
+    for fund_name, emoji, amount in fund_allocations:
+        if amount > 0:
+            rows_to_add.append([
+                now.strftime('%Y-%m-%d'),
+                'Fund Add',
+                fund_name,
+                amount,
+                f'Monthly allocation - {now.strftime("%b %Y")}',
+                'Joint',
+                now.strftime('%Y-%m-01'),
+                'slack'
+            ])
+            applied.append((fund_name, amount))
+
+    added_rows = []
+    if rows_to_add:
+        sheet.append_rows(rows_to_add)
+
+        # Track for undo
+        all_values = sheet.get_all_values()
+        first_row_index = len(all_values) - len(rows_to_add) + 1
+        for offset, (fund_name, amount) in enumerate(applied):
+            added_rows.append({
+                'row_index': first_row_index + offset,
+                'fund_name': fund_name,
+                'amount': amount
+            })
+
+    clear_sheet_cache()
+
+    # Store for undo
+    store_undo_action(channel, 'fund_apply', {'rows': added_rows})
+
+    # Get updated fund balances
+    funds = get_fund_status()
+
+    # Build response
+    msg = "✅ *Fund Allocation Applied!*\n\n"
+
+    if is_custom:
+        msg += "📝 Custom amounts:\n"
+    else:
+        msg += "📝 Suggested amounts (40/30/20/10):\n"
+
+    total_allocated = 0
+    for fund_name, emoji, amount in fund_allocations:
+        if amount > 0:
+            new_balance = funds.get(fund_name, {}).get('amount', 0)
+            msg += f"{emoji} {fund_name}: +{fmt(amount)} → {fmt(new_balance)}\n"
+            total_allocated += amount
+
+    msg += f"\n💰 Total allocated: {fmt(total_allocated)}\n"
+
+    # Emergency fund progress
+    emergency_balance = funds.get('Emergency Fund', {}).get('amount', 0)
+    progress = (emergency_balance / 15000000) * 100
+    msg += f"\n🎯 Emergency Fund: {progress:.1f}% → ₩15M"
+
+    # Check for milestone
+    milestone_msg = check_milestone('Emergency Fund', old_emergency_balance, emergency_balance)
+    if milestone_msg:
+        msg += f"\n\n{milestone_msg}"
+        wisdom = get_wisdom('milestone')
+        if wisdom:
+            msg += f"\n{wisdom}"
+    elif progress >= 100:
+        msg += "\n🎊 CONGRATULATIONS! Freedom achieved! 🎊"
+    elif progress >= 75:
+        msg += "\n🔥 Almost there! Keep going!"
+    elif progress >= 50:
+        msg += "\n💪 Halfway to freedom!"
+
+    post_message(channel, msg)
+
+def handle_paid(channel, text, text_lower, now):
+    """paid N - mark a listed loan as repaid"""
+    parts = text_lower.split()
+    if len(parts) < 2 or not parts[1].isdigit():
+        post_message(channel, "❓ Usage: `paid 1` (mark loan #1 as paid)")
+        return
+    
+    loan_index = int(parts[1]) - 1
+    success, result, undo_data = mark_loan_as_paid(loan_index, channel)
+    
+    if success:
+        # Store for undo
+        store_undo_action(channel, 'paid', undo_data)
         
-        # Command: Update fund balance (set total directly)
-        elif text_lower.startswith('update fund') or text_lower.startswith('cập nhật quỹ') or text_lower.startswith('cap nhat quy'):
-            fund_keywords = {
-                'emergency': ('Emergency Fund', '🎯'),
-                'khẩn cấp': ('Emergency Fund', '🎯'),
-                'khan cap': ('Emergency Fund', '🎯'),
-                'investment': ('Investment Fund', '📈'),
-                'đầu tư': ('Investment Fund', '📈'),
-                'dau tu': ('Investment Fund', '📈'),
-                'planning': ('Planning Fund', '🏠'),
-                'kế hoạch': ('Planning Fund', '🏠'),
-                'ke hoach': ('Planning Fund', '🏠'),
-                'date': ('Date Fund', '💕'),
-                'hẹn hò': ('Date Fund', '💕'),
-                'hen ho': ('Date Fund', '💕'),
-            }
+        msg = f"✅ Paid: {fmt(result['amount'])} - {result['description']}\n"
+        msg += f"💰 Logged as income: nhận lại/trả nợ"
+        post_message(channel, msg)
+    else:
+        post_message(channel, f"❌ {result}")
+
+def handle_list(channel, text, text_lower, now):
+    """list/last - show filtered transactions"""
+    if text_lower.startswith('last'):
+        words = text_lower.split()
+        limit = int(words[1]) if len(words) > 1 and words[1].isdigit() else 5
+        filter_type, filter_category, filter_person, filter_month, _ = None, None, None, None, limit
+    else:
+        filter_type, filter_category, filter_person, filter_month, limit = parse_list_command(text_lower, now)
+    
+    transactions = get_all_transactions()
+    filtered = filter_transactions(transactions, filter_type, filter_category, filter_person, filter_month, limit)
+    
+    title_parts = []
+    if filter_category:
+        title_parts.append(filter_category.title())
+    if filter_type:
+        title_parts.append(filter_type)
+    if filter_person:
+        title_parts.append(filter_person)
+    if filter_month:
+        try:
+            title_parts.append(f"{MONTH_FULL_NAMES[int(filter_month[5:7]) - 1]} {filter_month[:4]}")
+        except:
+            title_parts.append(filter_month)
+    if limit:
+        title_parts.append(f"Last {limit}")
+    
+    title = ' - '.join(title_parts) if title_parts else 'All Transactions'
+    
+    msg = format_transaction_list(filtered, title, channel)
+    post_message(channel, msg)
 
-            # Find which fund mentioned
-            fund_name = None
-            fund_emoji = '💰'
-            for keyword, (name, emoji) in fund_keywords.items():
-                if keyword in text_lower:
-                    fund_name = name
-                    fund_emoji = emoji
-                    break
-
-            if not fund_name:
-                slack_client.chat_postMessage(channel=channel, text="❓ Cách dùng:\n• `update fund emergency 8.7M`\n• `cập nhật quỹ khẩn cấp 8.7M`\n\nFunds: emergency, investment, planning, date")
-                return jsonify({'ok': True})
-
-            # Extract amount (this is the NEW TOTAL)
-            amount, _ = extract_amount_from_text(text)
-
-            if not amount:
-                slack_client.chat_postMessage(channel=channel, text=f"❓ Thiếu số tiền. Ví dụ: `update fund emergency 8.7M`")
-                return jsonify({'ok': True})
-
-            # Get old balance
-            funds = get_fund_status()
-            old_balance = funds.get(fund_name, {}).get('amount', 0)
-
-            # Always create NEW Fund Balance row (so it shows in list)
-            sheet = get_transaction_sheet()
-            if sheet:
-                now = datetime.now()
-
-                # Create new Fund Balance row
-                row_data = [
-                    now.strftime('%Y-%m-%d'),
-                    'Fund Balance',
-                    fund_name,
-                    amount,
-                    f'Update {fund_name}: {fmt(old_balance)} → {fmt(amount)}',
-                    'Joint',
-                    now.strftime('%Y-%m-01'),
-                    'slack'
-                ]
-                sheet.append_row(row_data)
-                all_values = sheet.get_all_values()
-                old_data = {'row_index': len(all_values), 'old_amount': old_balance, 'fund_name': fund_name, 'was_new': True}
-
-                # Store for undo
-                store_undo_action(channel, 'fund_update', old_data)
-
-                # Calculate change
-                change = amount - old_balance
-                if change >= 0:
-                    change_str = f"+{fmt(change)}"
-                else:
-                    change_str = f"{fmt(change)}"
-
-                # Progress for Emergency Fund
-                progress_msg = ""
-                if fund_name == 'Emergency Fund':
-                    progress = (amount / 15000000) * 100
-                    progress_msg = f"\n🎯 Tiến độ: {progress:.1f}% → ₩15M"
-
-                msg = f"{fund_emoji} {fund_name} Updated!\n"
-                msg += f"Số dư: {fmt(old_balance)} → {fmt(amount)} ({change_str}){progress_msg}"
-
-                # Check for milestone
-                milestone_msg = check_milestone(fund_name, old_balance, amount)
-                if milestone_msg:
-                    msg += f"\n\n{milestone_msg}"
-                    wisdom = get_wisdom('milestone')
-                    if wisdom:
-                        msg += f"\n{wisdom}"
-
-                slack_client.chat_postMessage(channel=channel, text=msg)
-            else:
-                slack_client.chat_postMessage(channel=channel, text="❌ Không thể kết nối sheet")
+def handle_delete(channel, text, text_lower, now):
+    """delete - remove listed transactions"""
+    target_str = text_lower.replace('delete', '').strip()
+    
+    if not target_str:
+        post_message(channel, "❓ Usage: `delete 1` or `delete 1,2,3` or `delete 1-5` or `delete last`")
+        return
+    
+    targets = parse_delete_targets(target_str)
+    
+    if not targets:
+        post_message(channel, "❓ Invalid format. Use: `delete 1` or `delete 1,2,3` or `delete 1-5`")
+        return
+    
+    success, message, deleted_items, deleted_rows_data = delete_transactions(targets, channel)
+    
+    if success:
+        # Store for undo
+        store_undo_action(channel, 'delete', deleted_rows_data)
+        
+        if len(deleted_items) == 1:
+            msg = f"🗑️ Deleted: {deleted_items[0]['category']} - {fmt(deleted_items[0]['amount'])}\n"
+        else:
+            msg = f"🗑️ Deleted {len(deleted_items)} items:\n"
+            for item in deleted_items[:5]:
+                msg += f"  • {item['category']} - {fmt(item['amount'])}\n"
+            if len(deleted_items) > 5:
+                msg += f"  ... and {len(deleted_items) - 5} more\n"
+        msg += "↩️ To undo: `undo`"
+        post_message(channel, msg)
+    else:
+        post_message(channel, f"❌ {message}")
+
+def handle_edit(channel, text, text_lower, now):
+    """edit N AMOUNT - change a listed transaction amount"""
+    words = text.split()
+    
+    if len(words) < 3:
+        post_message(channel, "❓ Usage: `edit 1 150K`")
+        return
+    
+    target = words[1]
+    new_amount_str = words[2]
+    
+    if not target.isdigit():
+        post_message(channel, "❓ Usage: `edit 1 150K`")
+        return
+    
+    idx = int(target) - 1
+    if channel not in last_list_results or idx >= len(last_list_results[channel]):
+        post_message(channel, "❌ Invalid number. Use `list` first")
+        return
+    
+    tx_to_edit = last_list_results[channel][idx]
+    new_amount = parse_amount(new_amount_str)
+    
+    if not new_amount:
+        post_message(channel, "❌ Invalid amount")
+        return
+    
+    success, old_value, edit_data = edit_transaction(tx_to_edit['row_index'], new_amount,
+                                                     old_value=tx_to_edit['amount'])
+    
+    if success:
+        # Store for undo
+        store_undo_action(channel, 'edit', edit_data)
+        
+        msg = f"✏️ Updated: {tx_to_edit['category']}\n"
+        msg += f"   {fmt(int(float(old_value)))} → {fmt(new_amount)}"
+        post_message(channel, msg)
+    else:
+        post_message(channel, f"❌ Error: {old_value}")
+
+def handle_set_budget(channel, text, text_lower, now):
+    """set budget CATEGORY AMOUNT"""
+    # Parse: "set budget dining 300K" or "set budget Food & Dining 300000"
+    parts = text.split()
+
+    if len(parts) < 4:
+        post_message(channel, "❓ Cách dùng: `set budget dining 300K`\n\nCategories: dining, groceries, entertainment, shopping, transport, business, healthcare, gift")
+        return
+
+    # Map short names to full category names (English + Vietnamese)
+    category_map = {
+        # Food & Dining
+        'dining': 'Food & Dining', 'food': 'Food & Dining', 'ăn': 'Food & Dining',
+        'ăn uống': 'Food & Dining', 'đồ ăn': 'Food & Dining', 'cơm': 'Food & Dining',
+        # Groceries
+        'groceries': 'Groceries', 'grocery': 'Groceries', 'chợ': 'Groceries',
+        'siêu thị': 'Groceries', 'rau': 'Groceries', 'thực phẩm': 'Groceries',
+        # Entertainment
+        'entertainment': 'Entertainment', 'giải trí': 'Entertainment', 'vui chơi': 'Entertainment',
+        # Shopping
+        'shopping': 'Shopping', 'mua sắm': 'Shopping', 'mua': 'Shopping',
+        # Transport
+        'transport': 'Transport', 'xe': 'Transport', 'đi lại': 'Transport', 'xăng': 'Transport',
+        # Business
+        'business': 'Business', 'kinh doanh': 'Business', 'công việc': 'Business',
+        # Healthcare
+        'healthcare': 'Healthcare', 'health': 'Healthcare', 'sức khỏe': 'Healthcare',
+        'thuốc': 'Healthcare', 'y tế': 'Healthcare',
+        # Gift
+        'gift': 'Gift', 'quà': 'Gift', 'tặng': 'Gift',
+    }
+
+    category_input = parts[2].lower()
+    category = category_map.get(category_input)
+
+    if not category:
+        post_message(channel, f"❓ Không tìm thấy category '{category_input}'\n\nCategories: dining/ăn, groceries/chợ, entertainment/giải trí, shopping/mua sắm, transport/xe, business, healthcare/sức khỏe, gift/quà")
+        return
+
+    amount = parse_amount(parts[3])
+    if not amount:
+        post_message(channel, f"❓ Số tiền không hợp lệ: '{parts[3]}'\n\nVí dụ: `set budget dining 300K`")
+        return
+
+    # Update budget (in memory)
+    old_budget = DEFAULT_BUDGETS.get(category, 0)
+    DEFAULT_BUDGETS[category] = amount
+
+    msg = f"✅ Đã cập nhật ngân sách!\n\n"
+    msg += f"📝 {category}: {fmt(old_budget)} → {fmt(amount)}\n"
+    msg += f"\n💡 Xem tất cả: `budgets`"
+
+    post_message(channel, msg)
+
+def handle_update_fund(channel, text, text_lower, now):
+    """update fund NAME AMOUNT - set a fund balance"""
+    fund_keywords = {
+        'emergency': ('Emergency Fund', '🎯'),
+        'khẩn cấp': ('Emergency Fund', '🎯'),
+        'khan cap': ('Emergency Fund', '🎯'),
+        'investment': ('Investment Fund', '📈'),
+        'đầu tư': ('Investment Fund', '📈'),
+        'dau tu': ('Investment Fund', '📈'),
+        'planning': ('Planning Fund', '🏠'),
+        'kế hoạch': ('Planning Fund', '🏠'),
+        'ke hoach': ('Planning Fund', '🏠'),
+        'date': ('Date Fund', '💕'),
+        'hẹn hò': ('Date Fund', '💕'),
+        'hen ho': ('Date Fund', '💕'),
+    }
+
+    # Find which fund mentioned
+    fund_name = None
+    fund_emoji = '💰'
+    for keyword, (name, emoji) in fund_keywords.items():
+        if keyword in text_lower:
+            fund_name = name
+            fund_emoji = emoji
+            break
 
-        # Try to parse as transaction
+    if not fund_name:
+        post_message(channel, "❓ Cách dùng:\n• `update fund emergency 8.7M`\n• `cập nhật quỹ khẩn cấp 8.7M`\n\nFunds: emergency, investment, planning, date")
+        return
+
+    # Extract amount (this is the NEW TOTAL)
+    amount, _ = extract_amount_from_text(text)
+
+    if not amount:
+        post_message(channel, f"❓ Thiếu số tiền. Ví dụ: `update fund emergency 8.7M`")
+        return
+
+    # Get old balance
+    funds = get_fund_status()
+    old_balance = funds.get(fund_name, {}).get('amount', 0)
+
+    # Always create NEW Fund Balance row (so it shows in list)
+    sheet = get_transaction_sheet()
+    if sheet:
+
+        # Create new Fund Balance row
+        row_data = [
+            now.strftime('%Y-%m-%d'),
+            'Fund Balance',
+            fund_name,
+            amount,
+            f'Update {fund_name}: {fmt(old_balance)} → {fmt(amount)}',
+            'Joint',
+            now.strftime('%Y-%m-01'),
+            'slack'
+        ]
+        sheet.append_row(row_data)
+        clear_sheet_cache()
+        all_values = sheet.get_all_values()
+        old_data = {'row_index': len(all_values), 'old_amount': old_balance, 'fund_name': fund_name, 'was_new': True}
+
+        # Store for undo
+        store_undo_action(channel, 'fund_update', old_data)
+
+        # Calculate change
+        change = amount - old_balance
+        if change >= 0:
+            change_str = f"+{fmt(change)}"
         else:
-            tx = parse_transaction(text, user_name)
-            if tx:
-                duplicate = check_duplicate_income(tx)
-                
-                success, msg, add_data = log_transaction(tx)
-                if success:
-                    # Store for undo
-                    store_undo_action(channel, 'add', add_data)
-                    
-                    response = build_response(tx, duplicate_warning=duplicate)
-                else:
-                    response = f"❌ Error: {msg}"
-                slack_client.chat_postMessage(channel=channel, text=response)
+            change_str = f"{fmt(change)}"
+
+        # Progress for Emergency Fund
+        progress_msg = ""
+        if fund_name == 'Emergency Fund':
+            progress = (amount / 15000000) * 100
+            progress_msg = f"\n🎯 Tiến độ: {progress:.1f}% → ₩15M"
+
+        msg = f"{fund_emoji} {fund_name} Updated!\n"
+        msg += f"Số dư: {fmt(old_balance)} → {fmt(amount)} ({change_str}){progress_msg}"
+
+        # Check for milestone
+        milestone_msg = check_milestone(fund_name, old_balance, amount)
+        if milestone_msg:
+            msg += f"\n\n{milestone_msg}"
+            wisdom = get_wisdom('milestone')
+            if wisdom:
+                msg += f"\n{wisdom}"
+
+        post_message(channel, msg)
+    else:
+        post_message(channel, "❌ Không thể kết nối sheet")
+
+# First token of the message -> (full command prefix, handler). The
+# prefix is re-checked before dispatch so e.g. `fund 500` still parses
+# as a transaction; insertion order preserves the old elif precedence.
+PREFIX_COMMANDS = {
+    'fund': ('fund apply', handle_fund_apply),
+    'áp': ('áp dụng quỹ', handle_fund_apply),
+    'ap': ('ap dung quy', handle_fund_apply),
+    'paid': ('paid', handle_paid),
+    'list': ('list', handle_list),
+    'last': ('last', handle_list),
+    'delete': ('delete', handle_delete),
+    'edit': ('edit', handle_edit),
+    'set': ('set budget', handle_set_budget),
+    'đặt': ('đặt ngân sách', handle_set_budget),
+    'update': ('update fund', handle_update_fund),
+    'cập': ('cập nhật quỹ', handle_update_fund),
+    'cap': ('cap nhat quy', handle_update_fund),
+}
+
+# ============== SLACK EVENT HANDLER ==============
+
+# Background workers so the webhook can ack before Sheets/Slack I/O finishes
+EXECUTOR = ThreadPoolExecutor(max_workers=4)
+
+def process_message_event(event):
+    """Handle a message event off the request thread"""
+    channel = event.get('channel')
+    text = event.get('text', '').strip()
+    user_id = event.get('user')
     
+    # Ignore messages directed at other bots (like @OpenClaw)
+    # Bot mentions at start look like: "<@U01234567> message..."
+    if RE_BOT_MENTION.match(text):
+        # If message STARTS with a mention, it's directed at another bot/user
+        # Finance Bot should not respond to these
+        return
+    
+    user_name = detect_user_name(user_id)
+
+    # One timestamp per message - threaded through the parse/log helpers
+    # so they don't each call datetime.now()
+    now = datetime.now()
+
+    text_lower = text.lower()
+
+    # Exact-match commands (status, bills, fund, list debt, undo, ...)
+    handler = EXACT_COMMANDS.get(text_lower)
+    if handler:
+        handler(channel)
+        return
+
+    first = text_lower.split(' ', 1)[0]
+    entry = PREFIX_COMMANDS.get(first)
+    if entry is None:
+        # Glued forms like `delete1,2` have no space after the command
+        # word - fall back to a prefix scan for those
+        for candidate in PREFIX_COMMANDS.values():
+            if text_lower.startswith(candidate[0]):
+                entry = candidate
+                break
+    if entry and text_lower.startswith(entry[0]):
+        entry[1](channel, text, text_lower, now)
+        return
+
+    # Try to parse as transaction
+    tx = parse_transaction(text, user_name, now)
+    if tx:
+        duplicate = check_duplicate_income(tx)
+
+        success, msg, add_data = log_transaction(tx, now)
+        if success:
+            # Store for undo
+            store_undo_action(channel, 'add', add_data)
+            
+            response = build_response(tx, duplicate_warning=duplicate)
+        else:
+            response = f"❌ Error: {msg}"
+        post_message(channel, response)
+
+def run_message_event(event):
+    """Executor entry point - surface worker errors instead of dropping them"""
+    try:
+        process_message_event(event)
+    except Exception as e:
+        traceback.print_exc()
+        channel = event.get('channel')
+        if channel:
+            try:
+                post_message(channel, f"❌ Error: {e}")
+            except Exception:
+                pass
+
+@app.route('/slack/events', methods=['POST'])
+def slack_events():
+    # Reject junk on headers alone (missing signature or stale timestamp,
+    # which also blocks replays) before reading the request body
+    timestamp = request.headers.get('X-Slack-Request-Timestamp')
+    if not timestamp or not request.headers.get('X-Slack-Signature'):
+        return jsonify({'error': 'invalid request'}), 403
+    try:
+        if abs(time.time() - int(float(timestamp))) > 300:
+            return jsonify({'error': 'invalid request'}), 403
+    except (ValueError, OverflowError):
+        return jsonify({'error': 'invalid request'}), 403
+
+    if not signature_verifier.is_valid_request(request.get_data(), request.headers):
+        return jsonify({'error': 'invalid request'}), 403
+
+    data = request.json
+
+    if data.get('type') == 'url_verification':
+        return jsonify({'challenge': data.get('challenge')})
+
+    event = data.get('event', {})
+    event_type = event.get('type')
+
+    # Drop events we would never act on (bot echoes, edits/deletes and
+    # other subtypes, attachment-only messages) before queueing a worker
+    if event.get('bot_id') or event.get('subtype') or not event.get('text'):
+        return jsonify({'ok': True})
+
+    event_id = event.get('client_msg_id') or event.get('event_ts') or data.get('event_id')
+    if is_duplicate_event(event_id):
+        return jsonify({'ok': True})
+
+    if event_type == 'message':
+        # Ack within Slack's 3s deadline; Sheets/Slack I/O runs off-thread
+        EXECUTOR.submit(run_message_event, event)
+
     return jsonify({'ok': True})
 
 @app.route('/', methods=['GET'])